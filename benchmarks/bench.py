@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""Benchmarks find_urls (and the finder it dispatches to) over the test corpus and scaled-up synthetic documents.
+
+    python benchmarks/bench.py --save benchmarks/baselines/main.json
+    python benchmarks/bench.py --compare benchmarks/baselines/main.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Set
+
+this_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(this_dir))
+
+import urlfinderlib
+import urlfinderlib.finders as finders
+
+from synthetic import GENERATORS, SIZES
+
+
+files_dir = os.path.join(os.path.dirname(this_dir), "tests", "files")
+
+# The finder that find_urls dispatches each corpus file to, so the finder can also be timed on its own
+CORPUS_FINDERS: Dict[str, Callable[[bytes], Set[str]]] = {
+    "base_url_malformed.html": lambda blob: finders.HtmlUrlFinder(blob).find_urls(),
+    "csv_lookalike.txt": lambda blob: finders.TextUrlFinder(blob).find_urls(strict=True),
+    "domain_as_url.txt": lambda blob: finders.TextUrlFinder(blob).find_urls(strict=True, domain_as_url=True),
+    "hello.bin": lambda blob: finders.DataUrlFinder(blob).find_urls(),
+    "looks_like_html.xml": lambda blob: finders.XmlUrlFinder(blob).find_urls(),
+    "sharedStrings.xml": lambda blob: finders.XmlUrlFinder(blob).find_urls(),
+    "test.csv": lambda blob: finders.CsvUrlFinder(blob).find_urls(),
+    "test.html": lambda blob: finders.HtmlUrlFinder(blob).find_urls(),
+    "test.ical": lambda blob: finders.IcalUrlFinder(blob).find_urls(),
+    "test.ooxml": lambda blob: finders.DataUrlFinder(blob).find_urls(),
+    "test.pdfparser": lambda blob: finders.PdfUrlFinder(blob).find_urls(),
+    "test_no_base_url.html": lambda blob: finders.HtmlUrlFinder(blob).find_urls(),
+    "text.xml": lambda blob: finders.XmlUrlFinder(blob).find_urls(),
+}
+
+SYNTHETIC_FINDERS: Dict[str, Callable[[bytes], Set[str]]] = {
+    "html_links": lambda blob: finders.HtmlUrlFinder(blob).find_urls(),
+    "email_body": lambda blob: finders.TextUrlFinder(blob).find_urls(strict=True),
+    "delimiter_dense": lambda blob: finders.TextUrlFinder(blob).find_urls(strict=True),
+    "pdf_links": lambda blob: finders.PdfUrlFinder(blob).find_urls(),
+    "tracking_urls": lambda blob: finders.TextUrlFinder(blob).find_urls(strict=True),
+}
+
+
+def get_cases(scale: float) -> Dict[str, bytes]:
+    cases = {}
+
+    for name in sorted(os.listdir(files_dir)):
+        with open(os.path.join(files_dir, name), "rb") as f:
+            cases[f"corpus/{name}"] = f.read()
+
+    for name, generator in GENERATORS.items():
+        cases[f"synthetic/{name}"] = generator(max(1, int(SIZES[name] * scale)))
+
+    return cases
+
+
+def get_finder(case: str) -> Callable[[bytes], Set[str]]:
+    group, name = case.split("/", 1)
+    return CORPUS_FINDERS.get(name) if group == "corpus" else SYNTHETIC_FINDERS.get(name)
+
+
+def time_function(function: Callable[[], Set[str]], repeat: int) -> Dict[str, Any]:
+    timings = []
+    urls = set()
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        urls = function()
+        timings.append(time.perf_counter() - start)
+
+    return {"min": min(timings), "median": statistics.median(timings), "urls": len(urls)}
+
+
+def run(cases: Dict[str, bytes], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+
+    for case, blob in cases.items():
+        functions = {"find_urls": lambda: urlfinderlib.find_urls(blob)}
+
+        finder = get_finder(case)
+        if finder:
+            functions["finder"] = lambda: finder(blob)
+
+        for function_name, function in functions.items():
+            result = time_function(function, repeat)
+            result["bytes"] = len(blob)
+            result["mb_per_second"] = len(blob) / result["min"] / 1e6
+            result["urls_per_second"] = result["urls"] / result["min"]
+
+            key = f"{case}:{function_name}"
+            results[key] = result
+            print(
+                f"{key:<52} {len(blob) / 1e3:>9.1f} KB {result['min'] * 1e3:>10.2f} ms "
+                f"{result['mb_per_second']:>8.2f} MB/s {result['urls_per_second']:>10.0f} URLs/s"
+            )
+
+    return results
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Prints the change in speed of every case against the baseline and returns the cases that got slower"""
+
+    regressions = []
+
+    print(f"\nCompared to the baseline from {baseline['created']} ({baseline['python']}):")
+    for key, result in results.items():
+        old = baseline["results"].get(key)
+        if not old:
+            continue
+
+        speedup = old["min"] / result["min"]
+        note = ""
+        if old["urls"] != result["urls"]:
+            note = f" (found {result['urls']} URLs instead of {old['urls']})"
+
+        if speedup < 1 - threshold:
+            regressions.append(key)
+            note = f" REGRESSION{note}"
+
+        print(f"{key:<52} {speedup:>6.2f}x{note}")
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the size of the synthetic documents")
+    parser.add_argument("--repeat", type=int, default=5, help="times to run each case (the fastest run is used)")
+    parser.add_argument("--filter", default="", help="only run the cases containing this string")
+    parser.add_argument("--save", help="write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare the results to this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    cases = {case: blob for case, blob in get_cases(args.scale).items() if args.filter in case}
+
+    # Warm up the lazily loaded TLD list and libmagic so the first case is not penalized.
+    urlfinderlib.find_urls(b"http://domain.com")
+
+    results = run(cases, args.repeat)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            baseline = {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scale": args.scale,
+                "results": results,
+            }
+            json.dump(baseline, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if baseline.get("scale") != args.scale:
+            print(f"Warning: the baseline used --scale {baseline.get('scale')}", file=sys.stderr)
+
+        if compare(baseline, results, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Measures the cold start cost of urlfinderlib with python -X importtime, in a fresh interpreter for each scenario.
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --repeat 10 --show 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from typing import Dict, List, Tuple
+
+this_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(this_dir)
+
+SCENARIOS = {
+    "import urlfinderlib": "import urlfinderlib",
+    "from urlfinderlib import find_urls": "from urlfinderlib import find_urls",
+    "find_urls(text)": "from urlfinderlib import find_urls; find_urls(b'Visit http://domain.com today.')",
+    "find_urls(text, mimetype)": "from urlfinderlib import find_urls; find_urls(b'http://domain.com', mimetype='text')",
+    "find_urls(html)": "from urlfinderlib import find_urls; find_urls(b'<html><a href=\"http://domain.com\">x</a></html>')",
+    "warmup()": "import urlfinderlib; urlfinderlib.warmup()",
+}
+
+importtime_pattern = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_scenario(code: str) -> Tuple[float, Dict[str, int]]:
+    """Returns the wall time of the scenario in ms and the cumulative import time of each module in microseconds"""
+
+    timed_code = f"import time; start = time.perf_counter(); {code}; print((time.perf_counter() - start) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", timed_code],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = importtime_pattern.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="times to run each scenario (the median is used)")
+    parser.add_argument("--show", type=int, default=0, help="also show the slowest imports of each scenario")
+    args = parser.parse_args(argv)
+
+    for name, code in SCENARIOS.items():
+        try:
+            runs = [run_scenario(code) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            # e.g., warmup() when measuring an older version
+            print(f"{name:<36} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+
+        wall = statistics.median(wall for wall, _ in runs)
+        modules = runs[-1][1]
+        heavy = [module for module in ("magic", "lxml.etree", "validators", "tld", "asyncio") if module in modules]
+
+        print(f"{name:<36} {wall:>8.1f} ms  {len(modules):>4} modules  heavy: {', '.join(heavy) or '-'}")
+
+        for module, microseconds in sorted(modules.items(), key=lambda item: -item[1])[: args.show]:
+            print(f"    {module:<40} {microseconds / 1000:>8.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Generators for scaled-up synthetic documents. Every generator is seeded, so the same size always produces the same
+document and benchmark results stay comparable between runs."""
+
+import random
+
+from typing import Callable, Dict
+from urllib.parse import quote
+
+
+WORDS = (
+    "account access action address agreement attached billing click confirm customer delivery details document "
+    "download email invoice link login message notice order package password payment please portal receipt "
+    "request review secure service shipment statement support team update verify view"
+).split()
+
+TLDS = ["com", "net", "org", "io", "co.uk", "de", "info"]
+
+
+def _domain(rng: random.Random) -> str:
+    return f"{rng.choice(WORDS)}{rng.randint(1, 999)}.{rng.choice(TLDS)}"
+
+
+def _url(rng: random.Random) -> str:
+    path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+    return f"{rng.choice(['http', 'https'])}://{_domain(rng)}/{path}?id={rng.randint(1, 10 ** 6)}"
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def html_links(n: int, seed: int = 1) -> bytes:
+    """An HTML document with n links spread over anchors, images, scripts, and inline styles"""
+
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Newsletter</title>", '<base href="https://www.example.com/">']
+    parts.append("</head><body>")
+
+    for i in range(n):
+        kind = i % 5
+        if kind == 0:
+            parts.append(f'<p>{_sentence(rng)} <a href="{_url(rng)}">{rng.choice(WORDS)}</a></p>')
+        elif kind == 1:
+            parts.append(f'<img src="{_url(rng)}.png" srcset="{_url(rng)}.png 2x" alt="{rng.choice(WORDS)}">')
+        elif kind == 2:
+            parts.append(f'<div style="background-image: url(\'{_url(rng)}.jpg\')">{_sentence(rng)}</div>')
+        elif kind == 3:
+            parts.append(f'<script>var next = "{_url(rng)}"; window.location.href = next;</script>')
+        else:
+            parts.append(f"<p>{_sentence(rng)} {_url(rng)} {_sentence(rng)}</p>")
+
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def email_body(n: int, seed: int = 2) -> bytes:
+    """A long plain text email body of n paragraphs, with a quoted reply chain and the occasional bare domain"""
+
+    rng = random.Random(seed)
+    lines = []
+
+    for i in range(n):
+        paragraph = [_sentence(rng) for _ in range(rng.randint(2, 6))]
+        if i % 3 == 0:
+            paragraph.insert(rng.randint(0, len(paragraph)), _url(rng))
+        if i % 7 == 0:
+            paragraph.append(f"Visit {_domain(rng)} for more.")
+
+        prefix = "> " * (i % 3)
+        lines.extend(f"{prefix}{line}" for line in paragraph)
+        lines.append("")
+
+    return "\n".join(lines).encode("utf-8")
+
+
+def delimiter_dense(n: int, seed: int = 3) -> bytes:
+    """Text made almost entirely of delimiters and short fragments (like minified code or logs), with few URLs"""
+
+    rng = random.Random(seed)
+    delimiters = "<>()[]{}\"',;|=:/\\"
+    parts = []
+
+    for i in range(n):
+        parts.append("".join(rng.choice(delimiters) + rng.choice(WORDS)[:3] for _ in range(20)))
+        if i % 50 == 0:
+            parts.append(f"({_url(rng)})")
+
+    return "".join(parts).encode("utf-8")
+
+
+def pdf_links(n: int, seed: int = 4) -> bytes:
+    """A PDF with n link annotations and the same URLs written out in its (uncompressed) text streams"""
+
+    rng = random.Random(seed)
+    objects = []
+
+    for _ in range(n):
+        url = _url(rng)
+        objects.append(f"<< /Type /Annot /Subtype /Link /A << /S /URI /URI ({url}) >> >>")
+        objects.append(f"<< /Length {len(url) + 20} >>\nstream\nBT ({url}) Tj ET\nendstream")
+
+    parts = ["%PDF-1.4"]
+    for i, obj in enumerate(objects, 1):
+        parts.append(f"{i} 0 obj\n{obj}\nendobj")
+
+    parts.append(f"trailer\n<< /Size {len(objects) + 1} >>\n%%EOF")
+    return "\n".join(parts).encode("latin-1")
+
+
+def tracking_urls(n: int, seed: int = 5) -> bytes:
+    """Text with n click-tracking URLs, each with many query parameters and an encoded destination URL"""
+
+    rng = random.Random(seed)
+    lines = []
+
+    for _ in range(n):
+        params = "&".join(f"{rng.choice(WORDS)}{j}={rng.randint(1, 10 ** 9)}" for j in range(rng.randint(10, 40)))
+        destination = quote(_url(rng), safe="")
+        lines.append(f"{_sentence(rng)} https://click.{_domain(rng)}/track?{params}&url={destination}")
+
+    return "\n".join(lines).encode("utf-8")
+
+
+# The name of each generator and its size at --scale 1
+GENERATORS: Dict[str, Callable[[int], bytes]] = {
+    "html_links": html_links,
+    "email_body": email_body,
+    "delimiter_dense": delimiter_dense,
+    "pdf_links": pdf_links,
+    "tracking_urls": tracking_urls,
+}
+
+SIZES = {
+    "html_links": 1000,
+    "email_body": 2000,
+    "delimiter_dense": 200,
+    "pdf_links": 1000,
+    "tracking_urls": 500,
+}
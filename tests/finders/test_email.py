@@ -0,0 +1,126 @@
+import base64
+
+from concurrent.futures import ThreadPoolExecutor
+
+import urlfinderlib
+import urlfinderlib.finders as finders
+
+from urlfinderlib.budget import Budget, use_budget
+from urlfinderlib.finders.email import get_part_mimetype
+
+html = base64.encodebytes(b'<html><body><a href="https://html.com/link">link</a></body></html>').decode()
+image = base64.encodebytes(b"\x89PNG\r\n\x1a\n http://image.com").decode()
+attachment = base64.encodebytes(b"%PDF-1.4\n<< /URI (http://attachment.com/file.pdf) >>").decode()
+
+email = f"""From: "Bob Test" <bob@domain.com>
+To: "Alice Test" <alice@domain.com>
+Subject: Test
+MIME-Version: 1.0
+Content-Type: multipart/mixed; boundary="outer"
+
+--outer
+Content-Type: multipart/alternative; boundary="inner"
+
+--inner
+Content-Type: text/plain; charset="utf-8"
+Content-Transfer-Encoding: quoted-printable
+
+Click https://plain.com/a-very-long-path-that-was-wrapped-by-quoted-=
+printable?x=3D1 now.
+--inner
+Content-Type: text/html; charset="utf-8"
+Content-Transfer-Encoding: base64
+
+{html}
+--inner--
+
+--outer
+Content-Type: text/plain; charset="iso-8859-1"
+Content-Transfer-Encoding: quoted-printable
+
+Caf=E9 https://latin1.com/caf=E9
+--outer
+Content-Type: text/plain; charset="x-unknown"
+
+https://unknown-charset.com
+--outer
+Content-Type: text/calendar
+
+BEGIN:VCALENDAR
+BEGIN:VEVENT
+URL:https://calendar.com
+END:VEVENT
+END:VCALENDAR
+--outer
+Content-Type: image/png
+Content-Transfer-Encoding: base64
+
+{image}
+--outer
+Content-Type: application/octet-stream
+Content-Disposition: attachment; filename="file.pdf"
+Content-Transfer-Encoding: base64
+
+{attachment}
+--outer
+Content-Type: text/plain
+
+--outer
+Content-Type: message/rfc822
+
+From: someone@domain.com
+Subject: Forwarded
+Content-Type: text/plain
+
+https://forwarded.com
+--outer--
+"""
+
+expected_urls = {
+    "https://plain.com/a-very-long-path-that-was-wrapped-by-quoted-printable?x=1",
+    "https://html.com/link",
+    "https://latin1.com/café",
+    "https://unknown-charset.com",
+    "https://calendar.com",
+    "http://attachment.com/file.pdf",
+    "https://forwarded.com",
+}
+
+
+def test_get_part_mimetype():
+    assert get_part_mimetype("image/png") is None
+    assert get_part_mimetype("video/mp4") is None
+    assert get_part_mimetype("text/html") == "html"
+    assert get_part_mimetype("application/xhtml+xml") == "html"
+    assert get_part_mimetype("text/calendar") == "vcalendar"
+    assert get_part_mimetype("application/xml") == "xml"
+    assert get_part_mimetype("application/rss+xml") == "xml"
+    assert get_part_mimetype("text/plain") == "text"
+    assert get_part_mimetype("TEXT/CSV") == "text"
+    assert get_part_mimetype("application/octet-stream") == ""
+
+
+def test_find_urls():
+    assert finders.EmailUrlFinder(email).find_urls() == expected_urls
+
+
+def test_find_urls_executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert finders.EmailUrlFinder(email.encode("utf-8"), executor=executor).find_urls() == expected_urls
+
+
+def test_find_urls_budget():
+    with use_budget(Budget(timeout=0)):
+        assert finders.EmailUrlFinder(email).find_urls() == set()
+
+    budget = Budget(max_tokens=0)
+    with use_budget(budget):
+        finder = finders.EmailUrlFinder(email)
+        assert list(finder.iter_parts())
+        assert finder.find_urls() == set()
+
+
+def test_find_urls_dispatch():
+    urls = urlfinderlib.find_urls(email)
+    assert expected_urls <= urls
+    assert "http://image.com" not in urls
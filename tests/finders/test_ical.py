@@ -1,5 +1,54 @@
 import urlfinderlib.finders as finders
+from urlfinderlib.finders.ical import get_vevent_values
+
+
+ical = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+SUMMARY:https://summary.com
+DESCRIPTION:Join here: https://domain.com/meet \\, or call\\nhttps://doma
+ in2.com/dial
+LOCATION;ALTREP="https://domain3.com/room":Room 1
+URL:https://domain4.com
+ATTACH;FMTTYPE=application/pdf:https://domain5.com/agenda.pdf
+ATTACH;ENCODING=BASE64;VALUE=BINARY:aHR0cHM6Ly9iaW5hcnkuY29t
+X-ALT-DESC;FMTTYPE=text/html:<a href="https://domain6.com">link</a>
+BEGIN:VALARM
+DESCRIPTION:https://alarm.com
+END:VALARM
+END:VEVENT
+END:VCALENDAR
+garbage after the end
+"""
 
 
 def test_create_text():
     assert finders.IcalUrlFinder("test")
+
+
+def test_find_urls():
+    assert finders.IcalUrlFinder(ical).find_urls() == {
+        "https://domain.com/meet",
+        "https://domain2.com/dial",
+        "https://domain3.com/room",
+        "https://domain4.com",
+        "https://domain5.com/agenda.pdf",
+        "https://domain6.com",
+    }
+
+
+def test_find_urls_malformed():
+    assert finders.IcalUrlFinder(b" folded\nBEGIN:VEVENT\nEND:VTODO\nno colon\nURL:https://domain.com").find_urls() == {
+        "https://domain.com"
+    }
+
+
+def test_get_vevent_values():
+    assert list(get_vevent_values(ical)) == [
+        "Join here: https://domain.com/meet , or call\nhttps://domain2.com/dial",
+        "Room 1",
+        "https://domain3.com/room",
+        "https://domain4.com",
+        "https://domain5.com/agenda.pdf",
+        '<a href="https://domain6.com">link</a>',
+    ]
@@ -3,3 +3,12 @@ import urlfinderlib.finders as finders
 
 def test_create_text():
     assert finders.TextUrlFinder("test")
+
+
+def test_find_urls_domain_as_url():
+    text = "Beacons to evil.com, evil.com and c2.evil.net (see report.notatld) via https://domain.com/index.html"
+    assert finders.TextUrlFinder(text).find_urls(domain_as_url=True) == {
+        "https://evil.com",
+        "https://c2.evil.net",
+        "https://domain.com/index.html",
+    }
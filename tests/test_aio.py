@@ -0,0 +1,168 @@
+import asyncio
+import pytest
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import urlfinderlib
+
+from urlfinderlib.aio import AsyncUrlFinder, find_urls_async
+
+
+class BlockingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.event = threading.Event()
+        self.started = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(self._wait_and_run, fn, *args, **kwargs)
+
+    def _wait_and_run(self, fn, *args, **kwargs):
+        self.started.set()
+        self.event.wait(5)
+        return fn(*args, **kwargs)
+
+
+async def _wait_for_thread(event: threading.Event) -> None:
+    while not event.is_set():
+        await asyncio.sleep(0.01)
+
+
+def test_find_urls_async():
+    async def run():
+        return await find_urls_async(b"http://domain.com http://domain2.com")
+
+    assert asyncio.run(run()) == urlfinderlib.find_urls(b"http://domain.com http://domain2.com")
+
+
+def test_find_urls_async_shared_finder():
+    async def run():
+        await urlfinderlib.find_urls_async("http://domain.com")
+        return await urlfinderlib.find_urls_async("http://domain2.com", mimetype="text/plain")
+
+    assert asyncio.run(run()) == {"http://domain2.com"}
+
+
+def test_find_urls_async_batches_small_documents():
+    async def run():
+        async with AsyncUrlFinder(max_concurrency=1) as finder:
+            results = await asyncio.gather(*[finder.find_urls(f"http://domain{i}.com") for i in range(10)])
+            return finder, results
+
+    finder, results = asyncio.run(run())
+    assert results == [{f"http://domain{i}.com"} for i in range(10)]
+    assert finder.documents == 10
+    assert finder.batches == 1
+
+    async def run():
+        async with AsyncUrlFinder(max_concurrency=1, max_batch_size=4) as finder:
+            await asyncio.gather(*[finder.find_urls(f"http://domain{i}.com") for i in range(10)])
+            return finder
+
+    assert asyncio.run(run()).batches == 3
+
+
+def test_find_urls_async_large_documents():
+    async def run():
+        async with AsyncUrlFinder(max_concurrency=1, small_document_size=20) as finder:
+            blobs = ["http://domain.com", "http://domain.com/" + "a" * 20, "http://domain2.com", "http://domain3.com"]
+            results = await asyncio.gather(*[finder.find_urls(blob) for blob in blobs])
+            return finder, results
+
+    finder, results = asyncio.run(run())
+    assert results == [
+        {"http://domain.com"},
+        {"http://domain.com/" + "a" * 20},
+        {"http://domain2.com"},
+        {"http://domain3.com"},
+    ]
+    assert finder.batches == 3
+
+
+def test_find_urls_async_exceptions():
+    async def run():
+        async with AsyncUrlFinder() as finder:
+            with pytest.raises(TypeError):
+                await finder.find_urls(1)
+
+            assert await finder.find_urls("http://domain.com") == {"http://domain.com"}
+
+        with pytest.raises(RuntimeError):
+            await finder.find_urls("http://domain.com")
+
+    asyncio.run(run())
+
+    executor = ThreadPoolExecutor()
+    executor.shutdown()
+
+    async def run():
+        async with AsyncUrlFinder(executor=executor) as finder:
+            with pytest.raises(RuntimeError):
+                await finder.find_urls("http://domain.com")
+
+    asyncio.run(run())
+
+
+def test_find_urls_async_cancel():
+    executor = BlockingExecutor()
+
+    async def run():
+        async with AsyncUrlFinder(executor=executor, max_concurrency=1) as finder:
+            processing = asyncio.create_task(finder.find_urls("http://domain.com"))
+            await _wait_for_thread(executor.started)
+
+            # Cancel one document while it is being processed and another while it is waiting in the queue
+            queued = [asyncio.create_task(finder.find_urls(f"http://domain{i}.com")) for i in range(2, 4)]
+            await asyncio.sleep(0)
+            processing.cancel()
+            queued[0].cancel()
+
+            executor.event.set()
+            assert await queued[1] == {"http://domain3.com"}
+            assert finder.documents == 2
+
+            for task in (processing, queued[0]):
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_find_urls_async_close():
+    executor = BlockingExecutor()
+
+    async def run():
+        finder = AsyncUrlFinder(executor=executor, max_concurrency=1, max_batch_size=2, small_document_size=20)
+        blobs = ["http://domain.com", "http://domain.com/" + "a" * 20, "http://domain2.com", "http://domain3.com"]
+        tasks = [asyncio.create_task(finder.find_urls(blob)) for blob in blobs]
+        await _wait_for_thread(executor.started)
+
+        # The first document is being processed, the second is held back from its batch, and the rest are queued
+        await finder.close()
+        for task in tasks:
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+    executor.event.set()
+    executor.shutdown()
+
+
+def test_find_urls_async_process_pool():
+    async def run():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            async with AsyncUrlFinder(executor=executor) as finder:
+                return await finder.find_urls(b"http://domain.com")
+
+    assert asyncio.run(run()) == {"http://domain.com"}
+
+
+def test_find_urls_async_timeout():
+    async def run():
+        return await find_urls_async(b"http://domain.com", timeout=0)
+
+    urls = asyncio.run(run())
+    assert urls.partial is True
+    assert urls.reason == "timeout"
@@ -0,0 +1,211 @@
+import os
+import pickle
+import pytest
+import time
+
+import urlfinderlib
+import urlfinderlib.finders as finders
+import urlfinderlib.helpers as helpers
+import urlfinderlib.tokenizer as tokenizer
+
+from urlfinderlib.budget import Budget, UnlimitedBudget, get_budget, use_budget
+from urlfinderlib.url import URLList, URLSet
+
+this_dir = os.path.dirname(os.path.realpath(__file__))
+files_dir = os.path.realpath(f"{this_dir}/files")
+
+
+def _read(file_name: str) -> bytes:
+    with open(f"{files_dir}/{file_name}", "rb") as f:
+        return f.read()
+
+
+def test_budget_limits():
+    budget = Budget(max_tokens=2)
+    assert budget.spend("tokens") is True
+    assert budget.spend("tokens") is True
+    assert budget.exhausted is False
+    assert budget.spend("tokens") is False
+    assert budget.exhausted_by == "tokens"
+
+    # Running out of tokens stops new work, but not the work already paid for with tokens
+    assert budget.check() is False
+    assert budget.spend("candidates") is True
+    assert budget.exhausted_by == "tokens"
+    assert budget.spent == {"tokens": 3, "candidates": 1, "children": 0}
+
+
+def test_budget_limit():
+    budget = Budget(max_candidates=3)
+    assert list(budget.limit(range(10), "candidates")) == [0, 1, 2]
+    assert budget.exhausted_by == "candidates"
+
+
+def test_budget_exhaust():
+    budget = Budget()
+    budget.exhaust("decompressed_size")
+    assert budget.check() is False
+    assert budget.exhausted_by == "decompressed_size"
+
+    # The first reason is kept
+    budget.exhaust("compression_ratio")
+    assert budget.exhausted_by == "decompressed_size"
+
+
+def test_budget_timeout():
+    budget = Budget(timeout=60)
+    assert budget.deadline is None
+    assert budget.check() is True
+
+    budget.start()
+    deadline = budget.deadline
+    budget.start()
+    assert budget.deadline == deadline
+    assert budget.check() is True
+
+    budget = Budget(timeout=0)
+    budget.start()
+    assert budget.check() is False
+    assert budget.exhausted_by == "timeout"
+
+
+def test_unlimited_budget():
+    budget = get_budget()
+    assert isinstance(budget, UnlimitedBudget)
+    assert budget.active is False
+    assert budget.check() is True
+    assert budget.spend("tokens", 10**9) is True
+
+    budget.exhaust("decompressed_size")
+    assert budget.exhausted is False
+
+    tokens = ["a", "b"]
+    assert budget.limit(tokens, "tokens") is tokens
+
+
+def test_use_budget():
+    budget = Budget(timeout=60)
+
+    with use_budget(budget):
+        assert get_budget() is budget
+        assert budget.deadline is not None
+
+    assert isinstance(get_budget(), UnlimitedBudget)
+
+
+def test_url_set():
+    urls = URLSet({"http://domain.com"}, partial=True, reason="timeout")
+    assert urls == {"http://domain.com"}
+
+    unpickled = pickle.loads(pickle.dumps(urls))
+    assert unpickled == urls
+    assert unpickled.partial is True
+    assert unpickled.reason == "timeout"
+
+    assert URLSet().partial is False
+
+
+def test_find_urls_budget():
+    blob = _read("test.html")
+
+    urls = urlfinderlib.find_urls(blob)
+    assert urls.partial is False
+    assert urls.reason is None
+
+    urls = urlfinderlib.find_urls(blob, budget=Budget(timeout=60, max_tokens=10**6))
+    assert urls.partial is False
+    assert urls == urlfinderlib.find_urls(blob)
+
+    for budget, reason in [(Budget(max_candidates=5), "candidates"), (Budget(max_children=5), "children")]:
+        partial_urls = urlfinderlib.find_urls(blob, budget=budget)
+        assert partial_urls.partial is True
+        assert partial_urls.reason == reason
+        assert partial_urls <= urls
+
+    text = "\n".join(f"http://domain{i}.com/index.html" for i in range(100))
+    urls = urlfinderlib.find_urls(text, budget=Budget(max_tokens=50))
+    assert urls.partial is True
+    assert urls.reason == "tokens"
+    assert 0 < len(urls) < 100
+
+    urls = urlfinderlib.find_urls(text, mimetype="text/plain", budget=Budget(max_candidates=50))
+    assert urls.reason == "candidates"
+    assert len(urls) == 50
+
+    urls = urlfinderlib.find_urls(blob, timeout=0)
+    assert urls.partial is True
+    assert urls.reason == "timeout"
+    assert urls == set()
+
+    assert urlfinderlib.find_urls(_read("email.rfc822"), timeout=0) == URLSet()
+
+
+def test_get_all_urls_budget():
+    urls = URLList()
+    urls.append("http://domain.com/?u=http://domain2.com")
+    urls.append("http://domain3.com/?u=http://domain4.com")
+
+    # Both URLs were found, but only the last one had its child URLs expanded
+    with use_budget(Budget(max_children=1)):
+        assert urls.get_all_urls() == {
+            "http://domain.com/?u=http://domain2.com",
+            "http://domain3.com/?u=http://domain4.com",
+            "http://domain4.com",
+        }
+
+
+@pytest.mark.parametrize(
+    "finder",
+    [
+        lambda: finders.CsvUrlFinder(_read("test.csv")),
+        lambda: finders.DataUrlFinder(_read("hello.bin")),
+        lambda: finders.HtmlUrlFinder(_read("test.html")),
+        lambda: finders.IcalUrlFinder(_read("test.ical")),
+        lambda: finders.TextUrlFinder(_read("csv_lookalike.txt")),
+        lambda: finders.XmlUrlFinder(_read("text.xml")),
+    ],
+)
+def test_finders_budget_timeout(finder):
+    finder = finder()
+
+    with use_budget(Budget(timeout=0)):
+        assert finder.find_urls() == set()
+
+
+def test_text_finder_budget_timeout(monkeypatch):
+    budget = Budget()
+    fix_possible_url = helpers.fix_possible_url
+
+    def fix_possible_url_slowly(value: str, domain_as_url: bool = False) -> str:
+        budget.deadline = time.monotonic()
+        return fix_possible_url(value, domain_as_url=domain_as_url)
+
+    monkeypatch.setattr(helpers, "fix_possible_url", fix_possible_url_slowly)
+
+    # The time ran out after the candidates were fixed, but before they were validated
+    with use_budget(budget):
+        assert finders.TextUrlFinder("http://domain.com/index.html").find_urls() == set()
+
+    assert budget.exhausted_by == "timeout"
+
+
+def test_pdf_finder_budget():
+    finder = finders.PdfUrlFinder(_read("test.pdfparser"))
+
+    with use_budget(Budget(max_tokens=1)):
+        assert len(finder.find_urls()) == 1
+
+
+def test_html_tree_finder_budget_timeout():
+    tree_finder = finders.HtmlTreeUrlFinder(_read("test.html").decode("utf-8"))
+
+    with use_budget(Budget(timeout=0)):
+        assert tree_finder._find_document_write_urls() == set()
+        assert tree_finder._find_visible_urls() == set()
+
+
+def test_tokenizer_budget_timeout():
+    tok = tokenizer.UTF8Tokenizer("(http://domain.com) (http://domain2.com)")
+
+    with use_budget(Budget(timeout=0)):
+        assert list(tok.get_tokens_between_parentheses()) == []
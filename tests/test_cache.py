@@ -0,0 +1,159 @@
+import pytest
+import time
+
+import urlfinderlib
+import urlfinderlib.urlfinderlib
+
+from urlfinderlib import Instrumentation
+from urlfinderlib.budget import Budget
+from urlfinderlib.cache import ResultCache
+from urlfinderlib.hosts import DomainFilter
+from urlfinderlib.url import URLSet
+
+
+@pytest.fixture
+def count_finds(monkeypatch):
+    calls = []
+    find_urls = urlfinderlib.urlfinderlib._find_urls
+
+    def counting_find_urls(*args, **kwargs):
+        calls.append(args)
+        return find_urls(*args, **kwargs)
+
+    monkeypatch.setattr(urlfinderlib.urlfinderlib, "_find_urls", counting_find_urls)
+    return calls
+
+
+def test_key():
+    key = ResultCache.key(b"http://domain.com")
+    assert key == ResultCache.key("http://domain.com")
+    assert len(key) == 40
+    assert key != ResultCache.key(b"http://domain.com", base_url="http://example.com")
+    assert key != ResultCache.key(b"http://domain.com", mimetype="text/plain")
+    assert key != ResultCache.key(b"http://domain.com", domain_as_url=True)
+    assert key != ResultCache.key(b"http://domain2.com")
+    assert key != ResultCache.key(b"http://domain.com", domain_filter=DomainFilter(exclude=["domain.com"]))
+
+
+def test_find_urls_cache(count_finds):
+    cache = ResultCache()
+    instrumentation = Instrumentation()
+
+    urls = urlfinderlib.find_urls(b"http://domain.com", cache=cache, instrumentation=instrumentation)
+    assert urls == {"http://domain.com"}
+
+    cached = urlfinderlib.find_urls(b"http://domain.com", cache=cache, instrumentation=instrumentation)
+    assert cached == urls
+    assert isinstance(cached, URLSet)
+    assert cached.partial is False
+    assert len(count_finds) == 1
+
+    # Changing the returned set does not change the cache.
+    cached.add("http://other.com")
+    assert urlfinderlib.find_urls(b"http://domain.com", cache=cache) == {"http://domain.com"}
+
+    urlfinderlib.find_urls(b"domain.com", cache=cache, domain_as_url=True)
+    assert len(count_finds) == 2
+
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert instrumentation.counters["cache_hits"] == 1
+    assert instrumentation.counters["cache_misses"] == 1
+
+
+def test_find_urls_cache_partial(count_finds):
+    cache = ResultCache()
+
+    assert urlfinderlib.find_urls(b"http://domain.com", cache=cache, budget=Budget(max_tokens=0)).partial is True
+    assert len(cache) == 0
+
+    assert urlfinderlib.find_urls(b"http://domain.com", cache=cache) == {"http://domain.com"}
+    assert len(count_finds) == 2
+
+
+def test_cache_lru():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", URLSet({"http://a.com"}))
+    cache.set("b", URLSet({"http://b.com"}))
+    assert cache.get("a") == {"http://a.com"}
+
+    cache.set("c", URLSet({"http://c.com"}))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"http://a.com"}
+    assert cache.get("c") == {"http://c.com"}
+
+
+def test_cache_ttl(monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    cache = ResultCache(ttl=10)
+    cache.set("a", URLSet({"http://a.com"}))
+    assert cache.get("a") == {"http://a.com"}
+
+    now += 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_disk(tmp_path, count_finds):
+    path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(path=path) as cache:
+        urls = urlfinderlib.find_urls(b"http://domain.com", cache=cache)
+
+    with ResultCache(path=path) as cache:
+        assert urlfinderlib.find_urls(b"http://domain.com", cache=cache) == urls
+        assert len(count_finds) == 1
+        assert len(cache) == 1
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.get(cache.key(b"http://domain.com")) is None
+
+    cache.close()
+
+
+def test_cache_disk_ttl(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(path=path, ttl=10) as cache:
+        cache.set("a", URLSet({"http://a.com"}))
+
+    now += 5
+    with ResultCache(path=path, ttl=10) as cache:
+        assert cache.get("a") == {"http://a.com"}
+
+        # The result expires from memory at the same time it expires on disk.
+        now += 5
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+
+
+def test_cache_disk_prune(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    with ResultCache(path=str(tmp_path / "cache.sqlite"), ttl=100, max_disk_entries=2, prune_interval=1) as cache:
+        cache.set("expired", URLSet({"http://expired.com"}))
+
+        now += 100
+        for key in ["a", "b"]:
+            now += 1
+            cache.set(key, URLSet({f"http://{key}.com"}))
+
+        rows = cache._db.execute("SELECT key FROM results ORDER BY key").fetchall()
+        assert rows == [("a",), ("b",)]
+
+        # Reading a result makes it the most recently used one on disk as well.
+        now += 1
+        cache._memory.clear()
+        assert cache.get("a") == {"http://a.com"}
+
+        now += 1
+        cache.set("c", URLSet({"http://c.com"}))
+        rows = cache._db.execute("SELECT key FROM results ORDER BY key").fetchall()
+        assert rows == [("a",), ("c",)]
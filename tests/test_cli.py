@@ -0,0 +1,139 @@
+import io
+import json
+import os
+import pytest
+
+from urlfinderlib import cli
+
+this_dir = os.path.dirname(os.path.realpath(__file__))
+files_dir = os.path.realpath(f"{this_dir}/files")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"http://a.com")
+    (tmp_path / "b.html").write_bytes(b'<html><body><a href="http://b.com/index.html">b</a></body></html>')
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "c.txt").write_bytes(b"http://c.com and http://d.com")
+    return tmp_path
+
+
+def _records(output: io.StringIO) -> list:
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_iter_paths_directory(tree):
+    assert list(cli.iter_paths([str(tree)])) == [f"{tree}/a.txt", f"{tree}/b.html", f"{tree}/sub/c.txt"]
+
+
+def test_iter_paths_include_exclude(tree):
+    assert list(cli.iter_paths([str(tree)], include=["*.txt"])) == [f"{tree}/a.txt", f"{tree}/sub/c.txt"]
+    assert list(cli.iter_paths([str(tree)], exclude=["*/sub/*"])) == [f"{tree}/a.txt", f"{tree}/b.html"]
+
+
+def test_iter_paths_glob(tree):
+    assert list(cli.iter_paths([f"{tree}/**/*.txt"])) == [f"{tree}/a.txt", f"{tree}/sub/c.txt"]
+
+
+def test_iter_paths_files_from(tree):
+    files_from = io.StringIO(f"{tree}/a.txt\n\n{tree}/sub\n")
+    assert list(cli.iter_paths([], files_from=files_from)) == [f"{tree}/a.txt", f"{tree}/sub/c.txt"]
+
+
+def test_iter_paths_missing_file():
+    assert list(cli.iter_paths(["/does/not/exist"])) == ["/does/not/exist"]
+
+
+def test_process_file():
+    record = cli.process_file(f"{files_dir}/test.csv", {})
+    assert record["path"] == f"{files_dir}/test.csv"
+    assert record["mimetype"] == "CSV text"
+    assert record["urls"] == sorted(record["urls"])
+    assert "http://domain.com" in record["urls"]
+    assert record["partial"] is False
+    assert record["seconds"] >= 0
+    assert "error" not in record
+
+
+def test_process_file_error():
+    record = cli.process_file("/does/not/exist", {})
+    assert record["urls"] == []
+    assert record["error"].startswith("FileNotFoundError")
+
+
+def test_main_text(tree):
+    output = io.StringIO()
+    assert cli.main([str(tree / "sub" / "c.txt")], output=output) == 0
+    assert output.getvalue() == "http://c.com\nhttp://d.com\n"
+
+
+def test_main_jsonl(tree):
+    output = io.StringIO()
+    assert cli.main(["--format", "jsonl", str(tree)], output=output) == 0
+
+    records = _records(output)
+    assert [record["path"] for record in records] == [f"{tree}/a.txt", f"{tree}/b.html", f"{tree}/sub/c.txt"]
+    assert records[0]["urls"] == ["http://a.com"]
+    assert records[1]["urls"] == ["http://b.com/index.html"]
+    assert records[2]["urls"] == ["http://c.com", "http://d.com"]
+
+
+def test_main_workers(tree):
+    output = io.StringIO()
+    assert cli.main(["--format", "jsonl", "--workers", "2", str(tree)], output=output) == 0
+    assert [record["urls"] for record in _records(output)] == [
+        ["http://a.com"],
+        ["http://b.com/index.html"],
+        ["http://c.com", "http://d.com"],
+    ]
+
+
+def test_main_timeout(tree):
+    output = io.StringIO()
+    assert cli.main(["--format", "jsonl", "--timeout", "0", str(tree / "a.txt")], output=output) == 0
+    assert _records(output)[0]["partial"] is True
+
+
+def test_main_options(tree):
+    (tree / "relative.html").write_bytes(b'<html><body><a href="/index.html">x</a></body></html>')
+
+    output = io.StringIO()
+    assert cli.main(["--base-url", "http://example.com", str(tree / "relative.html")], output=output) == 0
+    assert output.getvalue() == "http://example.com/index.html\n"
+
+    output = io.StringIO()
+    assert cli.main(["--mimetype", "text/plain", "--domain-as-url", "-v", str(tree / "a.txt")], output=output) == 0
+    assert output.getvalue() == "http://a.com\n"
+
+
+def test_main_files_from(tree, monkeypatch):
+    list_file = tree / "list"
+    list_file.write_text(f"{tree}/a.txt\n")
+
+    output = io.StringIO()
+    assert cli.main(["--files-from", str(list_file)], output=output) == 0
+    assert output.getvalue() == "http://a.com\n"
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{tree}/sub/c.txt\n"))
+    output = io.StringIO()
+    assert cli.main(["--files-from", "-"], output=output) == 0
+    assert output.getvalue() == "http://c.com\nhttp://d.com\n"
+
+
+def test_main_error(tree):
+    output = io.StringIO()
+    assert cli.main(["--format", "jsonl", str(tree / "a.txt"), "/does/not/exist"], output=output) == 1
+
+    records = _records(output)
+    assert "error" not in records[0]
+    assert records[1]["error"].startswith("FileNotFoundError")
+
+
+def test_main_usage(capsys):
+    assert cli.main([]) == 1
+    assert "usage: urlfinder" in capsys.readouterr().err
+
+
+def test_main_stdout(tree, capsys):
+    assert cli.main([str(tree / "a.txt")]) == 0
+    assert capsys.readouterr().out == "http://a.com\n"
@@ -0,0 +1,116 @@
+import bz2
+import gzip
+import lzma
+
+import urlfinderlib
+
+from urlfinderlib.budget import Budget, use_budget
+from urlfinderlib.compression import get_compression, iter_decompressed, split_lines
+from urlfinderlib.instrumentation import Instrumentation
+
+
+def test_get_compression():
+    assert get_compression(gzip.compress(b"test")) == "gzip"
+    assert get_compression(bz2.compress(b"test")) == "bzip2"
+    assert get_compression(lzma.compress(b"test")) == "xz"
+
+    assert get_compression(b"test") is None
+    assert get_compression(b"BZhello") is None
+    assert get_compression(b"") is None
+
+
+def test_iter_decompressed():
+    text = b"http://domain.com\n" * 1000
+
+    for compress in (gzip.compress, bz2.compress, lzma.compress):
+        chunks = list(iter_decompressed(compress(text), chunk_size=1000))
+        assert len(chunks) == 18
+        assert b"".join(chunks) == text
+
+
+def test_iter_decompressed_truncated():
+    text = b"".join(f"http://domain{i}.com\n".encode("utf-8") for i in range(10000))
+
+    for compress in (gzip.compress, bz2.compress, lzma.compress):
+        blob = compress(text)
+        decompressed = b"".join(iter_decompressed(blob[: len(blob) // 2]))
+        assert text.startswith(decompressed)
+        assert len(decompressed) < len(text)
+
+
+def test_iter_decompressed_max_size():
+    budget = Budget()
+    with use_budget(budget):
+        chunks = list(iter_decompressed(gzip.compress(b"a" * 10000), chunk_size=1000, max_size=2500))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert budget.exhausted_by == "decompressed_size"
+
+
+def test_iter_decompressed_max_ratio():
+    bomb = gzip.compress(b"\x00" * 64 * 1024 * 1024)
+
+    budget = Budget()
+    with use_budget(budget):
+        decompressed = sum(len(chunk) for chunk in iter_decompressed(bomb, max_ratio=100))
+
+    assert decompressed < 4 * 1024 * 1024
+    assert budget.exhausted_by == "compression_ratio"
+
+
+def test_iter_decompressed_budget():
+    budget = Budget(timeout=0)
+    with use_budget(budget):
+        assert list(iter_decompressed(gzip.compress(b"test"))) == []
+
+
+def test_split_lines():
+    assert list(split_lines([b"one\ntw", b"o\nthr", b"ee"])) == [b"one\n", b"two\n", b"three"]
+    assert list(split_lines([b"one", b"two\n"])) == [b"one", b"two\n"]
+    assert list(split_lines([])) == []
+
+
+def test_find_urls_compressed():
+    text = b"Visit http://domain.com today."
+
+    for compress in (gzip.compress, bz2.compress, lzma.compress):
+        assert urlfinderlib.find_urls(compress(text)) == {"http://domain.com"}
+
+
+def test_find_urls_compressed_html():
+    html = b'<html><body><a href="http://domain.com">test</a></body></html>'
+    assert urlfinderlib.find_urls(gzip.compress(html)) == {"http://domain.com"}
+
+
+def test_find_urls_compressed_large_text(monkeypatch):
+    monkeypatch.setattr("urlfinderlib.compression.CHUNK_SIZE", 1000)
+
+    lines = [f"Visit http://domain{i}.com/index.html today.\n".encode("utf-8") for i in range(1000)]
+    instrumentation = Instrumentation()
+
+    urls = urlfinderlib.find_urls(gzip.compress(b"".join(lines)), instrumentation=instrumentation)
+
+    assert urls == {f"http://domain{i}.com/index.html" for i in range(1000)}
+    assert instrumentation.counters["decompressed_bytes"] == sum(len(line) for line in lines)
+    assert instrumentation.calls["finder.TextUrlFinder"] > 1
+
+
+def test_find_urls_compressed_nested():
+    # Only one layer is decompressed, the inner blob is treated as binary data
+    blob = gzip.compress(gzip.compress(b"http://domain.com"))
+    assert urlfinderlib.find_urls(blob) == set()
+
+
+def test_find_urls_compressed_corrupt():
+    blob = b"\x1f\x8b\x08 http://domain.com"
+    assert urlfinderlib.find_urls(blob) == {"http://domain.com"}
+
+
+def test_find_urls_compressed_bomb():
+    bomb = gzip.compress(b"http://domain.com " + b" " * 64 * 1024 * 1024)
+
+    urls = urlfinderlib.find_urls(bomb, budget=Budget())
+
+    assert urls == {"http://domain.com"}
+    assert urls.partial is True
+    assert urls.reason == "compression_ratio"
@@ -13,6 +13,12 @@ def test_fix_possible_value():
     assert helpers.fix_possible_value('"//domain.com\\index\u0000.html"') == "//domain.com/index.html"
 
 
+def test_fix_scheme():
+    assert helpers.fix_scheme("http:domain.com") == "http://domain.com"
+    assert helpers.fix_scheme("http://domain.com") == "http://domain.com"
+    assert helpers.fix_scheme("http://dom[ain.com") == ""
+
+
 def test_fix_slashes():
     assert helpers.fix_slashes("http:/\\domain.com") == "http://domain.com"
     assert helpers.fix_slashes("http:/domain.com/index.html") == "http://domain.com/index.html"
@@ -61,3 +67,28 @@ def test_remove_null_characters():
 def test_remove_surrounding_quotes():
     assert helpers.remove_surrounding_quotes('"test"') == "test"
     assert helpers.remove_surrounding_quotes("'test'") == "test"
+
+
+def test_fix_possible_url_fused():
+    assert helpers.fix_possible_url("http:/\\domain.com/index.html") == "http://domain.com/index.html"
+    assert helpers.fix_possible_url("http:domain.com") == "http://domain.com"
+    assert helpers.fix_possible_url("\u200bdomain\u00ad.com/index.html") == "https://domain.com/index.html"
+    assert helpers.fix_possible_url("domain.com", domain_as_url=True) == "https://domain.com"
+    assert helpers.fix_possible_url("domain.com") == "domain.com"
+    assert helpers.fix_possible_url("user@domain.com") == "user@domain.com"
+    assert helpers.fix_possible_url("mailto:user@domain.com") == "//user@domain.com"
+    assert helpers.fix_possible_url("mailto:http://domain.com") == "http://domain.com"
+    assert helpers.fix_possible_url("mailto:domain.com/index.html") == "https://domain.com/index.html"
+    assert helpers.fix_possible_url("mailto:///[domain.com") == "mailto://[domain.com"
+    assert helpers.fix_possible_url("mailto:user") == "user"
+    assert helpers.fix_possible_url("mailto://domain.com/index.html") == "https://domain.com/index.html"
+    assert helpers.fix_possible_url("'//domain.com/index.html'") == "https://domain.com/index.html"
+    assert helpers.fix_possible_url("'http://domain.com'") == "http://domain.com"
+    assert helpers.fix_possible_url("::http://domain.com") == "http://domain.com"
+    assert helpers.fix_possible_url("http://domain\u0000.com/index.html") == "http://domain.com/index.html"
+    assert helpers.fix_possible_url("http://dom[ain.com") == ""
+    assert helpers.fix_possible_url("/\n/domain.com]") == ""
+
+
+def test_remove_hidden_unicode_characters():
+    assert helpers.remove_hidden_unicode_characters("\u200bhttp://do\u200dmain.com\ufeff") == "http://domain.com"
@@ -0,0 +1,104 @@
+from urlfinderlib.hosts import (
+    DomainFilter,
+    HostCache,
+    HostSuffixTrie,
+    NullDomainFilter,
+    get_domain_filter,
+    host_cache,
+    use_domain_filter,
+)
+from urlfinderlib.url import URL
+
+
+def test_host_cache_get():
+    cache = HostCache(maxsize=2)
+    assert cache.hit_rate == 0.0
+
+    assert cache.get("domain.com", "netloc_idna", lambda: "domain.com") == "domain.com"
+    assert cache.get("domain.com", "netloc_idna", lambda: "changed") == "domain.com"
+    assert cache.get("domain.com", "is_ipv4", lambda: False) is False
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.hit_rate == 1 / 3
+
+
+def test_host_cache_eviction():
+    cache = HostCache(maxsize=2)
+    cache.get("domain1.com", "netloc_idna", lambda: "domain1.com")
+    cache.get("domain2.com", "netloc_idna", lambda: "domain2.com")
+    cache.get("domain1.com", "netloc_idna", lambda: "domain1.com")
+    cache.get("domain3.com", "netloc_idna", lambda: "domain3.com")
+    assert len(cache) == 2
+
+    assert cache.get("domain1.com", "netloc_idna", lambda: "recomputed") == "domain1.com"
+    assert cache.get("domain2.com", "netloc_idna", lambda: "recomputed") == "recomputed"
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hit_rate == 0.0
+
+
+def test_host_cache_shared_by_urls():
+    host_cache.clear()
+    url = URL("http://faß.de/index.php?test")
+    assert url.is_url is True
+    assert url.permutations
+    misses = host_cache.misses
+
+    other_url = URL("http://faß.de/other.php")
+    assert other_url.is_url is True
+    assert other_url.netloc_idna is url.netloc_idna
+    assert host_cache.misses == misses
+    assert host_cache.hit_rate > 0.0
+
+
+def test_host_suffix_trie():
+    trie = HostSuffixTrie()
+    trie.add("domain.com", "suffix")
+    trie.add("www.domain.com", "exact", suffix=False)
+    trie.add("Sub.Domain.com.", "sub")
+
+    assert trie.get("domain.com") == ["suffix"]
+    assert trie.get("WWW.domain.com") == ["exact", "suffix"]
+    assert trie.get("a.www.domain.com") == ["suffix"]
+    assert trie.get("a.sub.domain.com") == ["sub", "suffix"]
+    assert trie.get("otherdomain.com") == []
+    assert trie.get("com") == []
+    assert trie.get("") == []
+    assert trie.get(None) == []
+
+
+def test_domain_filter_exclude():
+    domain_filter = DomainFilter(exclude=["W3.org", "schemas.openxmlformats.org."])
+    assert domain_filter.allows("domain.com")
+    assert not domain_filter.allows("w3.org")
+    assert not domain_filter.allows("www.W3.org")
+    assert not domain_filter.allows("schemas.openxmlformats.org")
+    assert domain_filter.allows("openxmlformats.org")
+    assert domain_filter.allows("notw3.org")
+    assert domain_filter.allows(None)
+
+
+def test_domain_filter_include():
+    domain_filter = DomainFilter(include=["example.com"], exclude=["internal.example.com"])
+    assert domain_filter.allows("example.com")
+    assert domain_filter.allows("www.example.com")
+    assert not domain_filter.allows("host.internal.example.com")
+    assert not domain_filter.allows("domain.com")
+    assert not domain_filter.allows("")
+
+
+def test_domain_filter_fingerprint():
+    assert DomainFilter(exclude=["b.com", "a.com"]).fingerprint == DomainFilter(exclude=["A.com", "b.com"]).fingerprint
+    assert DomainFilter(exclude=["a.com"]).fingerprint != DomainFilter(include=["a.com"]).fingerprint
+
+
+def test_use_domain_filter():
+    domain_filter = DomainFilter(exclude=["domain.com"])
+    assert isinstance(get_domain_filter(), NullDomainFilter)
+    assert get_domain_filter().allows("domain.com")
+
+    with use_domain_filter(domain_filter):
+        assert get_domain_filter() is domain_filter
+
+    assert get_domain_filter() is not domain_filter
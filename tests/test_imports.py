@@ -0,0 +1,54 @@
+import pytest
+import subprocess
+import sys
+
+import urlfinderlib
+import urlfinderlib.finders as finders
+
+
+def _modules_after(code: str) -> set:
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys; {code}; print(' '.join(sys.modules))"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_import_is_lazy():
+    modules = _modules_after("import urlfinderlib")
+    assert not {"magic", "lxml.etree", "validators", "tld", "asyncio", "urlfinderlib.url"} & modules
+
+
+def test_find_urls_imports_on_first_use():
+    modules = _modules_after("from urlfinderlib import find_urls")
+    assert not {"magic", "lxml.etree", "validators", "tld"} & modules
+
+    modules = _modules_after("from urlfinderlib import find_urls; find_urls(b'http://domain.com', mimetype='text')")
+    assert {"validators", "tld", "urlfinderlib.finders.text"} <= modules
+    assert not {"magic", "lxml.etree", "urlfinderlib.finders.html"} & modules
+
+
+def test_warmup():
+    modules = _modules_after("import urlfinderlib; urlfinderlib.warmup()")
+    assert {"magic", "lxml.etree", "validators", "tld"} <= modules
+    assert {f"urlfinderlib.finders.{name}" for name in ["csv", "data", "html", "ical", "pdf", "text", "xml"]} <= modules
+
+    urlfinderlib.warmup()
+
+
+def test_lazy_names():
+    from urlfinderlib.aio import AsyncUrlFinder
+    from urlfinderlib.finders.html import HtmlTreeUrlFinder
+
+    assert urlfinderlib.AsyncUrlFinder is AsyncUrlFinder
+    assert finders.HtmlTreeUrlFinder is HtmlTreeUrlFinder
+    assert set(urlfinderlib.__all__) <= set(dir(urlfinderlib))
+    assert set(finders.__all__) <= set(dir(finders))
+
+    with pytest.raises(AttributeError):
+        urlfinderlib.NotAName
+
+    with pytest.raises(AttributeError):
+        finders.NotAFinder
@@ -0,0 +1,86 @@
+import os
+
+import urlfinderlib
+
+from urlfinderlib.instrumentation import Instrumentation, NullInstrumentation, get_instrumentation, use_instrumentation
+
+this_dir = os.path.dirname(os.path.realpath(__file__))
+files_dir = os.path.realpath(f"{this_dir}/files")
+
+
+def test_instrumentation():
+    stages = []
+    instrumentation = Instrumentation(callback=lambda name, elapsed: stages.append(name))
+
+    with instrumentation.stage("outer"):
+        with instrumentation.stage("inner"):
+            instrumentation.count("tokens", 5)
+
+        with instrumentation.stage("inner"):
+            instrumentation.count("tokens")
+
+    assert stages == ["inner", "inner", "outer"]
+    assert instrumentation.timings["outer"] >= instrumentation.timings["inner"] > 0
+    assert instrumentation.as_dict()["calls"] == {"outer": 1, "inner": 2}
+    assert instrumentation.as_dict()["counters"] == {"tokens": 6}
+
+
+def test_null_instrumentation():
+    instrumentation = get_instrumentation()
+    assert isinstance(instrumentation, NullInstrumentation)
+    assert instrumentation.enabled is False
+
+    with instrumentation.stage("stage"):
+        instrumentation.count("tokens")
+
+    assert instrumentation.as_dict() == {"timings": {}, "calls": {}, "counters": {}}
+
+
+def test_use_instrumentation():
+    instrumentation = Instrumentation()
+
+    with use_instrumentation(instrumentation):
+        assert get_instrumentation() is instrumentation
+        urlfinderlib.find_urls("http://domain.com", mimetype="text/plain")
+
+    assert isinstance(get_instrumentation(), NullInstrumentation)
+    assert instrumentation.counters["urls"] == 1
+
+
+def test_find_urls_instrumentation():
+    with open(f"{files_dir}/test.html", "rb") as f:
+        blob = f.read()
+
+    instrumentation = Instrumentation()
+    urls = urlfinderlib.find_urls(blob, instrumentation=instrumentation)
+
+    assert {"magic", "unescape_ascii", "finder.HtmlUrlFinder", "lxml_parse", "child_urls"} <= set(
+        instrumentation.timings
+    )
+    assert {"tokenize", "fix_possible_url", "validate"} <= set(instrumentation.timings)
+    assert instrumentation.counters["tokens"] >= instrumentation.counters["candidates"]
+    assert instrumentation.counters["candidates"] >= instrumentation.counters["accepted"] > 0
+    assert instrumentation.counters["children"] > 0
+    assert instrumentation.counters["urls"] == len(urls)
+    assert isinstance(get_instrumentation(), NullInstrumentation)
+
+
+def test_find_urls_instrumentation_finders():
+    expected_stages = {
+        "email.rfc822": "finder.EmailUrlFinder",
+        "hello.bin": "finder.DataUrlFinder",
+        "sharedStrings.xml": "finder.XmlUrlFinder",
+        "test.csv": "finder.CsvUrlFinder",
+        "test.ical": "finder.IcalUrlFinder",
+        "test.pdfparser": "finder.PdfUrlFinder",
+        "text.xml": "finder.XmlUrlFinder",
+        "csv_lookalike.txt": "finder.TextUrlFinder",
+    }
+
+    for file_name, stage in expected_stages.items():
+        with open(f"{files_dir}/{file_name}", "rb") as f:
+            blob = f.read()
+
+        instrumentation = Instrumentation()
+        urlfinderlib.find_urls(blob, instrumentation=instrumentation)
+        assert stage in instrumentation.timings, file_name
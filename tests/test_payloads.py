@@ -0,0 +1,53 @@
+from urlfinderlib.payloads import decode_fragment, decode_payloads
+
+
+def test_decode_fragment_base64():
+    assert decode_fragment("/aHR0cDovL2RvbWFpbi5jb20=") == ("http://domain.com",)
+    assert decode_fragment("?u=aHR0cDovL2RvbWFpbi5jb20=") == ("http://domain.com",)
+    assert decode_fragment("/aHR0cDovL2RvbWFpbi5jb20vP2E9fn5-") == (
+        "http://domain.com/?a=~~",
+        "http://domain.com/?a=~~~",
+    )
+    assert decode_fragment("/index.html?aHR0cDovL2RvbWFpbi5jb20=") == ()
+    assert decode_fragment("/aHR0cDovL") == ()
+    assert decode_fragment("#ZnRw_9-_") == ("ftp",)
+
+
+def test_decode_fragment_hex():
+    assert decode_fragment("/r/687474703a2f2f646f6d61696e2e636f6d") == ("http://domain.com",)
+    assert decode_fragment("/r/687474703a2f2f646f6d61696e2e636f6dff") == ()
+    assert decode_fragment("/r/a687474703a2f2f646f6d61696e2e636f6d") == ()
+
+
+def test_decode_fragment_html_entities():
+    assert decode_fragment("/r/&#104;ttp&#58;&#x2F;&#x2f;domain.com&amp;b=1 x") == ("http://domain.com&b=1",)
+    assert decode_fragment("/a&amp;b") == ()
+
+
+def test_decode_fragment_percent():
+    assert decode_fragment("/r?u=https%253A%252F%252Fdomain.com%252Fa&b=1") == ("https%3A%2F%2Fdomain.com%2Fa",)
+    assert decode_fragment("/r?u=https%3A%2F%2Fdomain.com") == ("https://domain.com",)
+    assert decode_fragment("/r?u=100%25") == ()
+
+
+def test_decode_payloads():
+    # A base64 encoded, percent-encoded URL
+    value = "?u=aHR0cCUzQSUyRiUyRmRvbWFpbi5jb20lMkZwYXRoJTNGYSUzRDE="
+    assert decode_payloads(value) == {"http%3A%2F%2Fdomain.com%2Fpath%3Fa%3D1", "http://domain.com/path?a=1"}
+    assert decode_payloads(value, max_depth=1) == {"http%3A%2F%2Fdomain.com%2Fpath%3Fa%3D1"}
+    assert decode_payloads(value, max_payloads=1) == {"http%3A%2F%2Fdomain.com%2Fpath%3Fa%3D1"}
+    assert decode_payloads("/index.html") == set()
+
+    value = "?u=http%253A%252F%252Fdomain.com&v=http%3A%2F%2Fdomain.com"
+    assert decode_payloads(value) == {"http%3A%2F%2Fdomain.com", "http://domain.com"}
+
+
+def test_decode_payloads_nested():
+    # Percent-encoding the same URL over and over only unwraps as many layers as the depth allows
+    value = "http://domain.com"
+    for _ in range(10):
+        value = value.replace("%", "%25").replace(":", "%3A").replace("/", "%2F")
+
+    payloads = decode_payloads(f"/r?u={value}")
+    assert len(payloads) == 4
+    assert "http://domain.com" not in payloads
@@ -0,0 +1,64 @@
+import urlfinderlib.finders as finders
+from urlfinderlib.prefilter import CandidatePrefilter, get_tlds, has_known_tld, is_domain
+
+
+def test_get_tlds():
+    tlds = get_tlds()
+    assert "com" in tlds
+    assert "xn--p1ai" in tlds
+    assert "html" not in tlds
+
+
+def test_has_known_tld():
+    assert has_known_tld("http://DOMAIN.COM/index.html") is True
+    assert has_known_tld("user:pass@domain.co.uk:8080") is True
+    assert has_known_tld("/var/www/index.html") is False
+    assert has_known_tld("1/2.5") is False
+    assert has_known_tld(".com") is False
+
+
+def test_is_candidate():
+    prefilter = CandidatePrefilter()
+    assert prefilter.is_candidate("http://domain.com/index.html") is True
+    assert prefilter.is_candidate("http://192.168.1.1/index.html") is True
+    assert prefilter.is_candidate("http://localhost:8080/index.php") is True
+    assert prefilter.is_candidate("http://domain\u0000.com") is True
+    assert prefilter.is_candidate("http://faß.de") is True
+    assert prefilter.is_candidate("1/2.5") is False
+    assert prefilter.is_candidate("/usr/lib/python3.9/site.py/x") is True
+    assert prefilter.is_candidate("./notes.txt") is False
+    assert prefilter.is_candidate("a/b") is False
+    assert prefilter.is_candidate(f"http://domain.com/{'a' * 16384}") is False
+    assert prefilter.passed == 6
+    assert prefilter.discarded == 4
+
+
+def test_filter():
+    prefilter = CandidatePrefilter(max_length=30)
+    tokens = ["http://domain.com", "10/20/2021 12.30", "http://domain.com/a-path-longer-than-the-limit"]
+    assert list(prefilter.filter(tokens)) == ["http://domain.com"]
+    assert prefilter.discarded == 2
+
+
+def test_finders_share_prefilter():
+    prefilter = CandidatePrefilter()
+    finder = finders.DataUrlFinder(b"\x00\x01http://domain.com/index.html\x00\x01 1/2.5 thing/file.txt", prefilter=prefilter)
+    assert finder.find_urls() == {"http://domain.com/index.html"}
+    assert prefilter.passed > 0
+    assert prefilter.discarded > 0
+
+    finder = finders.HtmlUrlFinder('<a href="http://domain.com">1/2.5</a>')
+    assert finder.find_urls() == {"http://domain.com"}
+    assert finder.prefilter.discarded > 0
+
+
+def test_is_domain():
+    assert is_domain("domain.com") is True
+    assert is_domain("SUB.DOMAIN.CO.UK") is True
+    assert is_domain("faß.de") is True
+    assert is_domain("domain.xn--p1ai") is True
+    assert is_domain("domain.notatld") is False
+    assert is_domain("domain.com.") is False
+    assert is_domain("1.2.3.4") is False
+    assert is_domain("http://domain.com") is False
+    assert is_domain("a..😉") is False
@@ -0,0 +1,29 @@
+from urlfinderlib.redirectors import RedirectorRegistry, redirectors, register_redirector
+from urlfinderlib.url import URL
+
+
+def test_builtin_redirectors():
+    assert len(redirectors.get_decoders("mandrillapp.com")) == 1
+    assert len(redirectors.get_decoders("urldefense.proofpoint.com")) == 2
+    assert len(redirectors.get_decoders("urldefense.com")) == 2
+    assert redirectors.get_decoders("domain.com") == []
+
+
+def test_register_decoder():
+    registry = RedirectorRegistry()
+    registry.register("redirect.example", lambda url: url.query_dict.get("to", [""])[0])
+    decoder = registry.get_decoders("www.redirect.example")[0]
+    assert decoder(URL("https://www.redirect.example/?to=http://domain.com")) == "http://domain.com"
+
+
+def test_register_redirector():
+    def decode(url: URL) -> str:
+        return f"https://{url.split_value.path.strip('/')}.com" if url.split_value.path else ""
+
+    register_redirector("path-redirect.example", decode, suffix=False)
+
+    url = URL("https://path-redirect.example/domain")
+    assert url.child_urls == [URL("https://domain.com")]
+
+    assert URL("https://path-redirect.example").child_urls == []
+    assert URL("https://www.path-redirect.example/domain").child_urls == []
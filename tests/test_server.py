@@ -0,0 +1,258 @@
+import asyncio
+import os
+import pytest
+import struct
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import urlfinderlib
+
+from urlfinderlib import cli, server
+from urlfinderlib.aio import AsyncUrlFinder
+from urlfinderlib.server import UrlFinderClient, UrlFinderServer, pack_message, pack_request
+
+
+def _serve(client_function, **kwargs):
+    """Runs a server while the client function (given the server) runs in a thread, and returns its result"""
+
+    async def run():
+        async with AsyncUrlFinder() as finder:
+            url_finder_server = UrlFinderServer(finder, **kwargs)
+            await url_finder_server.start()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, client_function, url_finder_server)
+            finally:
+                await url_finder_server.close()
+
+    return asyncio.run(run())
+
+
+def _client(url_finder_server: UrlFinderServer) -> UrlFinderClient:
+    if url_finder_server.socket_path:
+        return UrlFinderClient(socket_path=url_finder_server.socket_path, timeout=10)
+
+    host, port = url_finder_server.address[:2]
+    return UrlFinderClient(host=host, port=port, timeout=10)
+
+
+def test_pack_request():
+    request = pack_request("http://domain.com", request_id=1, base_url="http://example.com", unknown=True)
+    (length,) = struct.unpack(">I", request[:4])
+    assert request[4 : 4 + length] == b'{"id": 1, "size": 17, "base_url": "http://example.com"}'
+    assert request[4 + length :] == b"http://domain.com"
+
+
+def test_server_tcp():
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            return client.find_urls(b"http://domain.com http://domain2.com")
+
+    urls = _serve(client_function)
+    assert urls == urlfinderlib.find_urls(b"http://domain.com http://domain2.com")
+    assert urls.partial is False
+    assert urls.reason is None
+
+
+def test_server_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "urlfinder.sock")
+
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            return client.find_urls('<html><body><a href="/index.html">x</a></body></html>', base_url="http://a.com")
+
+    assert _serve(client_function, socket_path=socket_path) == {"http://a.com/index.html"}
+    assert not os.path.exists(socket_path)
+
+
+def test_server_options():
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            return (
+                client.find_urls(b"domain.com", mimetype="text/plain", domain_as_url=True),
+                client.find_urls(b"http://domain.com", timeout=0),
+            )
+
+    domain_as_url, timed_out = _serve(client_function)
+    assert domain_as_url == {"https://domain.com"}
+    assert timed_out.partial is True
+    assert timed_out.reason == "timeout"
+
+
+def test_server_pipelining():
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            request_ids = [client.send(f"http://domain{i}.com") for i in range(10)]
+            request_ids.append(client.send(b"http://named.com", request_id="named"))
+            return request_ids, [client.receive() for _ in request_ids], url_finder_server.requests
+
+    request_ids, responses, requests = _serve(client_function, max_pipeline=2)
+    assert request_ids == list(range(1, 11)) + ["named"]
+    assert requests == 11
+
+    urls = {response["id"]: response["urls"] for response in responses}
+    assert urls == {**{i + 1: [f"http://domain{i}.com"] for i in range(10)}, "named": ["http://named.com"]}
+
+
+def test_server_concurrent_clients():
+    def client_function(url_finder_server):
+        clients = [_client(url_finder_server) for _ in range(3)]
+        for i, client in enumerate(clients):
+            client.send(f"http://domain{i}.com")
+
+        responses = [client.receive()["urls"] for client in clients]
+        for client in clients:
+            client.close()
+
+        return responses
+
+    assert _serve(client_function) == [["http://domain0.com"], ["http://domain1.com"], ["http://domain2.com"]]
+
+
+def test_server_errors(monkeypatch):
+    def find_urls(*args, **kwargs):
+        raise ValueError("bad document")
+
+    monkeypatch.setattr("urlfinderlib.aio.find_urls", find_urls)
+
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            with pytest.raises(RuntimeError, match="ValueError: bad document"):
+                client.find_urls(b"http://domain.com")
+
+    _serve(client_function)
+
+
+@pytest.mark.parametrize(
+    "request_bytes, error",
+    [
+        (struct.pack(">I", server.MAX_HEADER_SIZE + 1), "header is too large"),
+        (pack_message({"id": 1}), "invalid header"),
+        (struct.pack(">I", 3) + b"{{{", "invalid header"),
+        (pack_message({"id": 1, "size": 11}), "invalid document size"),
+    ],
+)
+def test_server_protocol_errors(request_bytes, error):
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            client._socket.sendall(request_bytes)
+            response = client.receive()
+
+            with pytest.raises(ConnectionError):
+                client.receive()
+
+            return response
+
+    response = _serve(client_function, max_document_size=10)
+    assert response["id"] is None
+    assert error in response["error"]
+
+
+def test_server_client_disconnects():
+    def client_function(url_finder_server):
+        with _client(url_finder_server) as client:
+            client.send(b"http://domain.com")
+            client._socket.sendall(struct.pack(">I", 100))
+
+        with _client(url_finder_server) as client:
+            return client.find_urls(b"http://domain2.com")
+
+    assert _serve(client_function) == {"http://domain2.com"}
+
+
+def test_server_serve_forever(tmp_path):
+    socket_path = str(tmp_path / "urlfinder.sock")
+    executor = ThreadPoolExecutor(max_workers=1)
+    event = threading.Event()
+    executor.submit(event.wait, 5)
+
+    async def run():
+        finder = AsyncUrlFinder(executor=executor)
+        url_finder_server = UrlFinderServer(finder, socket_path=socket_path)
+        task = asyncio.create_task(url_finder_server.serve_forever())
+
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+
+        # The request is stuck behind the blocked executor when the server is stopped.
+        client = UrlFinderClient(socket_path=socket_path)
+        client.send(b"http://domain.com")
+        while not url_finder_server.requests:
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        return client, finder
+
+    client, finder = asyncio.run(run())
+    event.set()
+    executor.shutdown()
+
+    with pytest.raises(ConnectionError):
+        client.receive()
+    client.close()
+
+    assert finder._closed
+    assert not os.path.exists(socket_path)
+
+
+def test_server_connection_cancelled():
+    executor = ThreadPoolExecutor(max_workers=1)
+    event = threading.Event()
+    executor.submit(event.wait, 5)
+
+    async def run():
+        async with AsyncUrlFinder(executor=executor) as finder:
+            url_finder_server = UrlFinderServer(finder)
+            await url_finder_server.start()
+
+            reader, writer = await asyncio.open_connection(*url_finder_server.address[:2])
+            writer.write(pack_request(b"http://domain.com"))
+            while not url_finder_server.requests:
+                await asyncio.sleep(0.01)
+
+            handler = next(task for task in asyncio.all_tasks() if task.get_coro().__name__ == "_handle")
+            responder = next(task for task in asyncio.all_tasks() if task.get_coro().__name__ == "_respond")
+            handler.cancel()
+            await asyncio.gather(handler, return_exceptions=True)
+            await asyncio.gather(responder, return_exceptions=True)
+
+            assert responder.cancelled()
+            assert await reader.read() == b""
+
+            writer.close()
+            await url_finder_server.close()
+
+    asyncio.run(run())
+    event.set()
+    executor.shutdown()
+
+
+def test_server_main(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / "urlfinder.sock")
+    results = []
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            results.append(
+                await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: UrlFinderClient(socket_path=socket_path).find_urls(b"http://domain.com")
+                )
+            )
+        finally:
+            await self.close()
+
+    monkeypatch.setattr(UrlFinderServer, "serve_forever", serve_forever)
+    assert cli.main(["serve", "--socket", socket_path, "--workers", "1", "-v"]) == 0
+    assert results == [{"http://domain.com"}]
+
+
+def test_server_main_interrupted(monkeypatch):
+    async def serve_forever(self):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(UrlFinderServer, "serve_forever", serve_forever)
+    assert server.main(["--port", "0", "--workers", "1"]) == 0
@@ -1,3 +1,5 @@
+import base64
+
 from urlfinderlib.url import *
 
 valid_urls = [
@@ -230,6 +232,14 @@ def test_url_decode_base64():
     assert url.child_urls == [URL("http://domain2.com")]
 
 
+def test_url_decode_nested_encoding():
+    url = URL("http://domain.com/r?u=aHR0cCUzQSUyRiUyRmRvbWFpbjIuY29tJTJGcGF0aCUzRmElM0Qx")
+    assert url.child_urls == [URL("http://domain2.com/path?a=1")]
+
+    url = URL("http://domain.com/r/687474703a2f2f646f6d61696e322e636f6d")
+    assert url.child_urls == [URL("http://domain2.com")]
+
+
 def test_url_decode_google_redirect():
     url = URL("https://www.google.com/url?sa=t&source=web&rct=j&url=http://domain.com")
     assert url.child_urls == [URL("http://domain.com")]
@@ -298,6 +308,30 @@ def test_url_decode_proofpoint_v3():
     assert url.is_proofpoint_v3 is True
     assert url.child_urls == ["https://link.edgepilot.com/s/822cebfe/5ZxIVsowtUueiP3V0OatBg?u=https://go.microsoft.com/fwlink/?Linkid=844050"]
 
+    # Test a run of multi-byte characters split across two tokens (124 bytes of "é" become 65 + 59 bytes)
+    replacement = base64.urlsafe_b64encode(("é" * 62).encode("utf-8")).decode("ascii").rstrip("=")
+    url = URL(f"https://urldefense.com/v3/__https://domain.com/index.php?a=**_**5&b=1__;{replacement}!!asdf$")
+    assert url.decode_proofpoint_v3() == f"https://domain.com/index.php?a={'é' * 62}&b=1"
+
+    # Test a URL with more tokens than replacement characters
+    url = URL("https://urldefense.com/v3/__https://domain.com/index.php?a=*&b=*__;fg!!asdf$")
+    assert url.decode_proofpoint_v3() == ""
+
+    # Test a URL with invalid replacement characters
+    url = URL("https://urldefense.com/v3/__https://domain.com/index.php?a=*__;/w!!asdf$")
+    assert url.decode_proofpoint_v3() == ""
+
+    # Test unquoting the decoded URL
+    url = URL("https://urldefense.com/v3/__https://domain.com/index.php?a=*&b=c%20d__;Jg!!asdf$")
+    assert url.decode_proofpoint_v3() == "https://domain.com/index.php?a=&&b=c%20d"
+    assert url.decode_proofpoint_v3(unquote_url=True) == "https://domain.com/index.php?a=&&b=c d"
+
+
+def test_url_decode_proofpoint_v3_long_url():
+    # Every token used to shift the rest of the URL and the replacement characters, which was quadratic
+    url = URL(f"https://urldefense.com/v3/__https://domain.com/?a={'b*' * 10000}__;{'fn5-' * 3334}!!asdf$")
+    assert url.decode_proofpoint_v3() == f"https://domain.com/?a={'b~' * 10000}"
+
 def test_url_get_fragment_values():
     url = URL("https://domain.com/index.php#a=1&b=2&c=3")
     assert url.get_fragment_values() == {"1", "2", "3"}
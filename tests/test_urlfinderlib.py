@@ -1,6 +1,11 @@
 import os
 
 import urlfinderlib
+import urlfinderlib.finders
+
+from urlfinderlib.budget import Budget, get_budget
+from urlfinderlib.hosts import DomainFilter, use_domain_filter
+from urlfinderlib.url import URLList
 from urlfinderlib.urlfinderlib import (
     _has_u_escaped_lowercase_bytes,
     _has_u_escaped_uppercase_bytes,
@@ -201,6 +206,96 @@ def test_find_urls_domain_as_url():
     assert urlfinderlib.find_urls(blob, domain_as_url=True) == expected_urls
 
 
+def test_iter_urls():
+    for file_name in sorted(os.listdir(files_dir)):
+        with open(f"{files_dir}/{file_name}", "rb") as f:
+            blob = f.read()
+
+        urls = list(urlfinderlib.iter_urls(blob))
+        assert len(urls) == len(set(urls))
+        assert set(urls) == urlfinderlib.find_urls(blob)
+
+
+def test_iter_urls_stops_early(monkeypatch):
+    calls = []
+    text_finder = urlfinderlib.finders.TextUrlFinder
+
+    def counting_text_finder(*args, **kwargs):
+        calls.append(args)
+        return text_finder(*args, **kwargs)
+
+    monkeypatch.setattr(urlfinderlib.finders, "TextUrlFinder", counting_text_finder)
+
+    # Text that might be HTML goes through the HTML finder and then the text finder.
+    blob = '<a href="http://html.com/">x</a> http://text.com'
+    urls = urlfinderlib.iter_urls(blob, mimetype="text")
+    assert next(urls) in {"http://html.com", "http://text.com"}
+    urls.close()
+    assert calls == []
+
+    assert set(urlfinderlib.iter_urls(blob, mimetype="text")) == {"http://html.com", "http://text.com"}
+    assert len(calls) == 1
+
+
+def test_iter_urls_child_urls():
+    url = "http://redirect.com/?url=http%3A%2F%2Fchild.com%2F%3Furl%3Dhttp%253A%252F%252Fgrandchild.com"
+    urls = urlfinderlib.iter_urls(url)
+    assert next(urls) == url
+    assert set(urls) == urlfinderlib.find_urls(url) - {url}
+
+
+def test_iter_urls_budget():
+    url = "http://redirect.com/?url=http%3A%2F%2Fchild.com"
+    instrumentation = urlfinderlib.Instrumentation()
+    budget = Budget(max_children=0)
+
+    assert list(urlfinderlib.iter_urls(url, budget=budget, instrumentation=instrumentation)) == [url]
+    assert budget.exhausted_by == "children"
+    assert instrumentation.counters["urls"] == 1
+    assert get_budget() is not budget
+
+    budget = Budget(timeout=0)
+    assert list(urlfinderlib.iter_urls(url, timeout=0)) == list(urlfinderlib.iter_urls(url, budget=budget)) == []
+    assert budget.exhausted_by == "timeout"
+
+
+def test_find_urls_domain_filter():
+    blob = b"http://domain.com http://www.w3.org/1999/xhtml http://schemas.openxmlformats.org/x http://other.com"
+    instrumentation = urlfinderlib.Instrumentation()
+
+    domain_filter = DomainFilter(exclude=["w3.org", "schemas.openxmlformats.org"])
+    urls = urlfinderlib.find_urls(blob, domain_filter=domain_filter, instrumentation=instrumentation)
+    assert urls == {"http://domain.com", "http://other.com"}
+    assert instrumentation.counters["filtered"] == 2
+
+    domain_filter = DomainFilter(include=["domain.com"])
+    assert urlfinderlib.find_urls(blob, domain_filter=domain_filter) == {"http://domain.com"}
+    assert set(urlfinderlib.iter_urls(blob, domain_filter=domain_filter)) == {"http://domain.com"}
+
+
+def test_find_urls_domain_filter_child_urls():
+    blob = b"http://redirect.com/?url=http%3A%2F%2Fchild.com"
+    assert urlfinderlib.find_urls(blob) == {"http://redirect.com/?url=http%3A%2F%2Fchild.com", "http://child.com"}
+
+    # The children of excluded URLs are never expanded.
+    assert urlfinderlib.find_urls(blob, domain_filter=DomainFilter(exclude=["redirect.com"])) == set()
+
+    # Excluded children are dropped.
+    domain_filter = DomainFilter(exclude=["child.com"])
+    assert urlfinderlib.find_urls(blob, domain_filter=domain_filter) == {
+        "http://redirect.com/?url=http%3A%2F%2Fchild.com"
+    }
+
+
+def test_find_urls_domain_filter_ascii_url():
+    urls = URLList()
+    with use_domain_filter(DomainFilter(exclude=["excluded.com"])):
+        urls.append("http://domain.com\u2019")
+        urls.append("http://excluded.com\u2019")
+
+    assert urls == ["http://domain.com"]
+
+
 def test_get_url_permutations():
     url = "http://faß.de/index.php?test<123/😉"
 
@@ -1,6 +1,44 @@
-def is_url(url: str) -> bool:
-    return URL(url).is_url
+import importlib
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from urlfinderlib.url import URL
+    from urlfinderlib.urlfinderlib import get_url_permutations, find_urls, iter_urls, warmup
+    from urlfinderlib.aio import AsyncUrlFinder, find_urls_async
+    from urlfinderlib.instrumentation import Instrumentation
+
+
+# The public names and the modules they come from. The modules (and their dependencies, like libmagic, lxml, and the
+# TLD list) are only imported the first time one of their names is used.
+_lazy_names = {
+    "URL": "urlfinderlib.url",
+    "get_url_permutations": "urlfinderlib.urlfinderlib",
+    "find_urls": "urlfinderlib.urlfinderlib",
+    "iter_urls": "urlfinderlib.urlfinderlib",
+    "warmup": "urlfinderlib.urlfinderlib",
+    "AsyncUrlFinder": "urlfinderlib.aio",
+    "find_urls_async": "urlfinderlib.aio",
+    "Instrumentation": "urlfinderlib.instrumentation",
+}
+
+__all__ = ["is_url", *_lazy_names]
+
 
+def __getattr__(name: str):
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from urlfinderlib.url import URL
-from urlfinderlib.urlfinderlib import get_url_permutations, find_urls
+    value = getattr(importlib.import_module(_lazy_names[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def is_url(url: str) -> bool:
+    from urlfinderlib.url import URL
+
+    return URL(url).is_url
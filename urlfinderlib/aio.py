@@ -0,0 +1,187 @@
+import asyncio
+import weakref
+
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from urlfinderlib.urlfinderlib import find_urls
+
+# Documents smaller than this are batched together so that a burst of small documents costs a single executor hop.
+SMALL_DOCUMENT_SIZE = 64 * 1024
+MAX_BATCH_SIZE = 32
+
+QueueItem = Tuple[Dict[str, Any], asyncio.Future]
+
+
+def _find_urls_batch(jobs: List[Dict[str, Any]]) -> List[Union[Set[str], Exception]]:
+    """Runs find_urls on each job inside the executor. This is module-level so a process pool can pickle it."""
+
+    results = []
+    for job in jobs:
+        try:
+            results.append(find_urls(**job))
+        except Exception as e:
+            results.append(e)
+
+    return results
+
+
+class AsyncUrlFinder:
+    """Runs find_urls in an executor so that large documents do not block the event loop. The executor defaults to the
+    event loop's default executor, but a ProcessPoolExecutor can be given to use more than one CPU.
+
+    Documents wait in a bounded queue (awaiting find_urls applies backpressure once it is full) and are picked up by
+    max_concurrency worker tasks. A worker that finds more small documents waiting in the queue sends them to the
+    executor together. Cancelling a find_urls call removes its document from the queue, or abandons its result if the
+    document is already being processed.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = 4,
+        max_queue_size: int = 256,
+        small_document_size: int = SMALL_DOCUMENT_SIZE,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.small_document_size = small_document_size
+        self.max_batch_size = max_batch_size
+
+        self.batches = 0
+        self.documents = 0
+
+        self._executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncUrlFinder":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self._closed = True
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+
+    async def find_urls(
+        self,
+        blob: Union[bytes, str],
+        base_url: str = "",
+        mimetype: str = "",
+        domain_as_url: bool = False,
+        timeout: float = None,
+    ) -> Set[str]:
+        if self._closed:
+            raise RuntimeError("AsyncUrlFinder is closed")
+
+        self._start()
+
+        job = {"blob": blob, "base_url": base_url, "mimetype": mimetype, "domain_as_url": domain_as_url}
+        if timeout is not None:
+            job["timeout"] = timeout
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    def _start(self) -> None:
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_concurrency)]
+
+    def _is_small(self, job: Dict[str, Any]) -> bool:
+        return isinstance(job["blob"], (bytes, str)) and len(job["blob"]) < self.small_document_size
+
+    def _next_batch(self, first: QueueItem) -> Tuple[List[QueueItem], Optional[QueueItem]]:
+        """Returns the batch starting with the given item, plus the next item if it had to be left out of the batch"""
+
+        batch = [first]
+        leftover = None
+
+        # Only documents that are already waiting are batched, so a lone document is never delayed.
+        while self._is_small(first[0]) and len(batch) < self.max_batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if not self._is_small(item[0]):
+                leftover = item
+                break
+
+            batch.append(item)
+
+        return [(job, future) for job, future in batch if not future.cancelled()], leftover
+
+    async def _work(self) -> None:
+        leftover = None
+
+        try:
+            while True:
+                batch, leftover = self._next_batch(leftover or await self._queue.get())
+                if batch:
+                    await self._run_batch(batch)
+        finally:
+            if leftover is not None:
+                leftover[1].cancel()
+
+    async def _run_batch(self, batch: List[QueueItem]) -> None:
+        self.batches += 1
+        self.documents += len(batch)
+
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _find_urls_batch, [job for job, _ in batch]
+            )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have been cancelled while the document was being processed.
+            if future.done():
+                continue
+
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_default_finders: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncUrlFinder]" = weakref.WeakKeyDictionary()
+
+
+async def find_urls_async(
+    blob: Union[bytes, str],
+    base_url: str = "",
+    mimetype: str = "",
+    domain_as_url: bool = False,
+    timeout: float = None,
+    finder: Optional[AsyncUrlFinder] = None,
+) -> Set[str]:
+    """The asyncio version of find_urls. It uses a shared AsyncUrlFinder for the running event loop unless one is
+    given."""
+
+    if finder is None:
+        loop = asyncio.get_running_loop()
+        finder = _default_finders.get(loop)
+        if finder is None:
+            finder = _default_finders[loop] = AsyncUrlFinder()
+
+    return await finder.find_urls(
+        blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url, timeout=timeout
+    )
@@ -0,0 +1,127 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Budget:
+    """Limits how long, or how much work, finding the URLs in a single document can take.
+
+    The tokenizer and finder loops check the budget cooperatively and stop early once it runs out, so find_urls returns
+    the URLs it found up to that point (marked as partial) instead of running unbounded. A budget can limit the wall
+    time in seconds (timeout), the number of tokens, the number of candidate URLs that get fixed up and validated, and
+    the number of URLs whose child URLs get expanded. The timeout starts when the budget is first used.
+    """
+
+    active = True
+
+    def __init__(
+        self,
+        timeout: float = None,
+        max_tokens: int = None,
+        max_candidates: int = None,
+        max_children: int = None,
+    ):
+        self.timeout = timeout
+        self.limits = {"tokens": max_tokens, "candidates": max_candidates, "children": max_children}
+
+        self.deadline: Optional[float] = None
+        self.exhausted_by: Optional[str] = None
+        self.spent: Dict[str, int] = {"tokens": 0, "candidates": 0, "children": 0}
+
+    @property
+    def exhausted(self) -> bool:
+        return self.exhausted_by is not None
+
+    def check(self) -> bool:
+        """Returns True while there is budget (and time) left"""
+
+        return self.exhausted_by is None and not self.timed_out()
+
+    def exhaust(self, reason: str) -> None:
+        """Marks the budget as run out by something outside of it, e.g. a decompression limit"""
+
+        if self.exhausted_by is None:
+            self.exhausted_by = reason
+
+    def limit(self, iterable: Iterable[T], kind: str) -> Iterator[T]:
+        """Yields the items of the iterable, spending one unit of the given kind on each, until the budget runs out"""
+
+        for item in iterable:
+            if not self.spend(kind):
+                return
+
+            yield item
+
+    def spend(self, kind: str, amount: int = 1) -> bool:
+        """Returns False if there is no budget of the given kind (or time) left. Running out of one kind does not stop
+        the work that was already paid for with another kind, e.g. validating the tokens that fit in the budget."""
+
+        self.spent[kind] += amount
+
+        limit = self.limits[kind]
+        if limit is not None and self.spent[kind] > limit:
+            if self.exhausted_by is None:
+                self.exhausted_by = kind
+
+            return False
+
+        return not self.timed_out()
+
+    def timed_out(self) -> bool:
+        """Returns True once the deadline has passed, even if something else ran out first"""
+
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            if self.exhausted_by is None:
+                self.exhausted_by = "timeout"
+
+            return True
+
+        return False
+
+    def start(self) -> None:
+        if self.deadline is None and self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+
+
+class UnlimitedBudget(Budget):
+    """The budget used when none was given. It never runs out and its checks cost next to nothing."""
+
+    active = False
+
+    def check(self) -> bool:
+        return True
+
+    def exhaust(self, reason: str) -> None:
+        pass
+
+    def limit(self, iterable: Iterable[T], kind: str) -> Iterable[T]:
+        return iterable
+
+    def spend(self, kind: str, amount: int = 1) -> bool:
+        return True
+
+    def timed_out(self) -> bool:
+        return False
+
+
+_current_budget: ContextVar[Budget] = ContextVar("urlfinderlib_budget", default=UnlimitedBudget())
+
+
+def get_budget() -> Budget:
+    return _current_budget.get()
+
+
+@contextmanager
+def use_budget(budget: Budget) -> Iterator[Budget]:
+    """Limits everything done in the block (in the current thread or asyncio task) with the given budget"""
+
+    budget.start()
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Tuple, Union
+
+from urlfinderlib.hosts import DomainFilter
+from urlfinderlib.instrumentation import get_instrumentation
+from urlfinderlib.url import URLSet
+
+# Bump this whenever a change to the finders changes their results, so older cached results are not reused.
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """Caches the URLs found in documents, keyed by a hash of the document's contents and the find_urls options, so
+    exact duplicates (e.g., signature images, HTML templates, and calendar invites) are only parsed once.
+
+    Results are kept in an in-memory LRU of up to max_entries documents and, if a path is given, in a sqlite database
+    of up to max_disk_entries documents that can be shared between processes and survives restarts. Results older
+    than ttl seconds are treated as missing. Partial results (from a budget that ran out) are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl: float = None,
+        path: str = None,
+        max_disk_entries: int = 1000000,
+        prune_interval: int = 1024,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.prune_interval = prune_interval
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, FrozenSet[str]]]" = OrderedDict()
+        self._writes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, urls TEXT, created REAL, accessed REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    @staticmethod
+    def key(
+        blob: Union[bytes, str],
+        base_url: str = "",
+        mimetype: str = "",
+        domain_as_url: bool = False,
+        domain_filter: DomainFilter = None,
+    ) -> str:
+        if isinstance(blob, str):
+            blob = blob.encode("utf-8", errors="ignore")
+
+        domain_filter = domain_filter.fingerprint if domain_filter else None
+        options = json.dumps([CACHE_VERSION, base_url, mimetype, domain_as_url, domain_filter]).encode("utf-8")
+
+        digest = hashlib.blake2b(blob, digest_size=20)
+        digest.update(b"\x00")
+        digest.update(options)
+        return digest.hexdigest()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, key: str) -> Optional[URLSet]:
+        """Returns a copy of the cached URLs, or None if the key is not cached (or has expired)"""
+
+        with self._lock:
+            urls = self._get_memory(key)
+            if urls is None and self._db is not None:
+                entry = self._get_disk(key)
+                if entry is not None:
+                    created, urls = entry
+                    self._set_memory(key, urls, created=created)
+
+        if urls is None:
+            self.misses += 1
+            get_instrumentation().count("cache_misses")
+            return None
+
+        self.hits += 1
+        get_instrumentation().count("cache_hits")
+        return URLSet(urls)
+
+    def set(self, key: str, urls: URLSet) -> None:
+        if getattr(urls, "partial", False):
+            return
+
+        urls = frozenset(urls)
+        with self._lock:
+            self._set_memory(key, urls)
+            if self._db is not None:
+                self._set_disk(key, urls)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created >= self.ttl
+
+    def _get_memory(self, key: str) -> Optional[FrozenSet[str]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+
+        created, urls = entry
+        if self._expired(created, time.time()):
+            del self._memory[key]
+            return None
+
+        self._memory.move_to_end(key)
+        return urls
+
+    def _set_memory(self, key: str, urls: FrozenSet[str], created: float = None) -> None:
+        self._memory[key] = (time.time() if created is None else created, urls)
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[Tuple[float, FrozenSet[str]]]:
+        row = self._db.execute("SELECT urls, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if self._expired(row[1], now):
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+
+        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return row[1], frozenset(json.loads(row[0]))
+
+    def _set_disk(self, key: str, urls: FrozenSet[str]) -> None:
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, urls, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(sorted(urls)), now, now),
+        )
+
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            self._prune_disk(now)
+
+    def _prune_disk(self, now: float) -> None:
+        """Deletes the expired results and then the least recently used results over the size limit"""
+
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM results WHERE created <= ?", (now - self.ttl,))
+
+        self._db.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
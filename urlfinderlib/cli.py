@@ -0,0 +1,169 @@
+import argparse
+import fnmatch
+import glob
+import json
+import logging
+import magic
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+
+from urlfinderlib.urlfinderlib import find_urls
+
+
+def _matches(path: str, include: List[str], exclude: List[str]) -> bool:
+    name = os.path.basename(path)
+
+    if include and not any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern) for pattern in include):
+        return False
+
+    return not any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern) for pattern in exclude)
+
+
+def iter_paths(
+    paths: Iterable[str], include: List[str] = None, exclude: List[str] = None, files_from: TextIO = None
+) -> Iterator[str]:
+    """Yields the files to scan: the given files, the files matching any glob patterns, the files inside of any
+    directories (recursively), and the files listed one per line in files_from. The include and exclude glob patterns
+    are matched against the file name or the path of the files found inside of directories."""
+
+    include = include or []
+    exclude = exclude or []
+
+    paths = list(paths)
+    if files_from is not None:
+        paths += [line.rstrip("\r\n") for line in files_from if line.strip()]
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    if _matches(file_path, include, exclude):
+                        yield file_path
+        elif not os.path.exists(path) and glob.has_magic(path):
+            yield from iter_paths(sorted(glob.glob(path, recursive=True)), include=include, exclude=exclude)
+        else:
+            yield path
+
+
+def process_file(path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Finds the URLs in a single file and returns its JSON record. This is module-level so the worker processes can
+    pickle it."""
+
+    record = {"path": path, "mimetype": None, "urls": [], "seconds": 0.0, "partial": False}
+
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+
+        record["mimetype"] = options.get("mimetype") or magic.from_buffer(blob)
+        urls = find_urls(
+            blob,
+            base_url=options.get("base_url", ""),
+            mimetype=record["mimetype"],
+            domain_as_url=options.get("domain_as_url", False),
+            timeout=options.get("timeout"),
+        )
+
+        record["urls"] = sorted(urls)
+        record["partial"] = urls.partial
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def _process_files(paths: List[str], options: Dict[str, Any], workers: int) -> Iterator[Dict[str, Any]]:
+    """Yields the record of each file in order as soon as it is ready"""
+
+    if workers <= 1:
+        for path in paths:
+            yield process_file(path, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(process_file, paths, [options] * len(paths), chunksize=4)
+
+
+def _write_record(record: Dict[str, Any], output_format: str, output: TextIO) -> None:
+    if output_format == "jsonl":
+        output.write(json.dumps(record) + "\n")
+    else:
+        for url in record["urls"]:
+            output.write(f"{url}\n")
+
+    output.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="urlfinder", description="Find the URLs in files.")
+    parser.add_argument("paths", nargs="*", help="files, directories (scanned recursively), or glob patterns")
+    parser.add_argument("--files-from", metavar="FILE", help="read the paths to scan from FILE (- for stdin)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB", help="only scan matching files")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="skip matching files")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text", help="print URLs or JSONL records")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("-t", "--timeout", type=float, help="seconds to spend on each file before giving up")
+    parser.add_argument("--base-url", default="", help="base URL for relative URLs in HTML files")
+    parser.add_argument("--mimetype", default="", help="skip detecting the mimetype of the files")
+    parser.add_argument("--domain-as-url", action="store_true", help="treat bare domains in text as URLs")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debugging information")
+    return parser
+
+
+def main(argv: List[str] = None, output: TextIO = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        from urlfinderlib import server
+
+        return server.main(argv[1:])
+
+    output = output or sys.stdout
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s %(name)s.%(funcName)s +%(lineno)s: %(levelname)-8s %(message)s",
+    )
+
+    if not args.paths and not args.files_from:
+        parser.print_usage(sys.stderr)
+        return 1
+
+    files_from = None
+    if args.files_from == "-":
+        files_from = sys.stdin
+    elif args.files_from:
+        files_from = open(args.files_from)
+
+    try:
+        paths = list(iter_paths(args.paths, include=args.include, exclude=args.exclude, files_from=files_from))
+    finally:
+        if files_from is not None and files_from is not sys.stdin:
+            files_from.close()
+
+    options = {
+        "base_url": args.base_url,
+        "mimetype": args.mimetype,
+        "domain_as_url": args.domain_as_url,
+        "timeout": args.timeout,
+    }
+
+    failed = False
+    for record in _process_files(paths, options, args.workers):
+        if "error" in record:
+            failed = True
+            logging.error(f"exception parsing {record['path']}: {record['error']}")
+
+        _write_record(record, args.format, output)
+
+    return 1 if failed else 0
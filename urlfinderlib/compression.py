@@ -0,0 +1,105 @@
+import bz2
+import gzip
+import io
+import lzma
+import re
+import zlib
+
+from typing import Callable, Dict, IO, Iterable, Iterator, Optional
+
+from urlfinderlib.budget import get_budget
+from urlfinderlib.instrumentation import get_instrumentation
+
+CHUNK_SIZE = 1024 * 1024
+
+# Decompression stops once this much has been decompressed, or once the content is this many times larger than the
+# compressed data that was read to get it (after the first MIN_RATIO_SIZE bytes), which is what a decompression bomb
+# looks like. Logs and exports rarely compress by more than 100x.
+MAX_DECOMPRESSED_SIZE = 256 * 1024 * 1024
+MAX_RATIO = 200
+MIN_RATIO_SIZE = 1024 * 1024
+
+_openers: Dict[str, Callable[[IO[bytes]], IO[bytes]]] = {
+    "gzip": lambda f: gzip.GzipFile(fileobj=f),
+    "bzip2": bz2.BZ2File,
+    "xz": lzma.LZMAFile,
+}
+
+# The magic bytes of each format, including enough of the header that plain text is not mistaken for it
+_magic_patterns = {
+    "gzip": re.compile(rb"\x1f\x8b\x08"),
+    "bzip2": re.compile(rb"BZh[1-9]1AY&SY"),
+    "xz": re.compile(rb"\xfd7zXZ\x00"),
+}
+
+
+def get_compression(blob: bytes) -> Optional[str]:
+    """Returns the compression format (gzip, bzip2, or xz) of the blob, if it is compressed"""
+
+    for name, pattern in _magic_patterns.items():
+        if pattern.match(blob):
+            return name
+
+    return None
+
+
+def iter_decompressed(
+    blob: bytes,
+    chunk_size: int = None,
+    max_size: int = None,
+    max_ratio: float = None,
+) -> Iterator[bytes]:
+    """Yields the decompressed contents of a gzip, bzip2, or xz blob in chunks, so the whole decompressed contents
+    never have to be in memory at once. It stops at the first error (e.g., truncated data), or at the size and ratio
+    limits, in which case the budget is marked as exhausted."""
+
+    chunk_size = chunk_size or CHUNK_SIZE
+    max_size = max_size or MAX_DECOMPRESSED_SIZE
+    max_ratio = max_ratio or MAX_RATIO
+
+    budget = get_budget()
+    instrumentation = get_instrumentation()
+
+    compressed = io.BytesIO(blob)
+    decompressed_size = 0
+
+    with _openers[get_compression(blob)](compressed) as f:
+        while budget.check():
+            try:
+                chunk = f.read(min(chunk_size, max_size - decompressed_size + 1))
+            except (EOFError, OSError, lzma.LZMAError, zlib.error):
+                return
+
+            if not chunk:
+                return
+
+            decompressed_size += len(chunk)
+            instrumentation.count("decompressed_bytes", len(chunk))
+
+            if decompressed_size > max_size:
+                budget.exhaust("decompressed_size")
+                yield chunk[: len(chunk) - (decompressed_size - max_size)]
+                return
+
+            if decompressed_size > MIN_RATIO_SIZE and decompressed_size > max_ratio * compressed.tell():
+                budget.exhaust("compression_ratio")
+                return
+
+            yield chunk
+
+
+def split_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Moves the last partial line of each chunk to the start of the next one, so the text that spans two chunks (e.g.
+    a URL) is not cut in half. Chunks without a line break are yielded whole."""
+
+    carry = b""
+    for chunk in chunks:
+        chunk = carry + chunk
+
+        end = chunk.rfind(b"\n") + 1 or len(chunk)
+        carry = chunk[end:]
+
+        yield chunk[:end]
+
+    if carry:
+        yield carry
@@ -1,7 +1,42 @@
-from urlfinderlib.finders.csv import CsvUrlFinder
-from urlfinderlib.finders.data import DataUrlFinder
-from urlfinderlib.finders.html import HtmlUrlFinder, HtmlTreeUrlFinder
-from urlfinderlib.finders.ical import IcalUrlFinder
-from urlfinderlib.finders.pdf import PdfUrlFinder
-from urlfinderlib.finders.text import TextUrlFinder
-from urlfinderlib.finders.xml import XmlUrlFinder
+import importlib
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from urlfinderlib.finders.csv import CsvUrlFinder
+    from urlfinderlib.finders.data import DataUrlFinder
+    from urlfinderlib.finders.email import EmailUrlFinder
+    from urlfinderlib.finders.html import HtmlUrlFinder, HtmlTreeUrlFinder
+    from urlfinderlib.finders.ical import IcalUrlFinder
+    from urlfinderlib.finders.pdf import PdfUrlFinder
+    from urlfinderlib.finders.text import TextUrlFinder
+    from urlfinderlib.finders.xml import XmlUrlFinder
+
+
+# Each finder is imported the first time it is used, so e.g. lxml is only loaded once there is HTML to parse.
+_lazy_names = {
+    "CsvUrlFinder": "urlfinderlib.finders.csv",
+    "DataUrlFinder": "urlfinderlib.finders.data",
+    "EmailUrlFinder": "urlfinderlib.finders.email",
+    "HtmlUrlFinder": "urlfinderlib.finders.html",
+    "HtmlTreeUrlFinder": "urlfinderlib.finders.html",
+    "IcalUrlFinder": "urlfinderlib.finders.ical",
+    "PdfUrlFinder": "urlfinderlib.finders.pdf",
+    "TextUrlFinder": "urlfinderlib.finders.text",
+    "XmlUrlFinder": "urlfinderlib.finders.xml",
+}
+
+__all__ = list(_lazy_names)
+
+
+def __getattr__(name: str):
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_lazy_names[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
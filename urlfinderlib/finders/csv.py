@@ -4,6 +4,7 @@ import io
 from typing import Set, Union
 
 from .text import TextUrlFinder
+from urlfinderlib.budget import get_budget
 from urlfinderlib.url import URLList
 
 
@@ -23,8 +24,13 @@ class CsvUrlFinder:
                 if "." in item and "/" in item:
                     possible_urls.add(item)
 
+        budget = get_budget()
+
         urls = URLList()
         for possible_url in possible_urls:
+            if not budget.check():
+                break
+
             urls += TextUrlFinder(possible_url).find_urls(strict=True)
 
         return set(urls)
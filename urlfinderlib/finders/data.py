@@ -3,15 +3,18 @@ from typing import Set, Union
 import urlfinderlib.tokenizer as tokenizer
 
 from .text import TextUrlFinder
+from urlfinderlib.budget import get_budget
+from urlfinderlib.prefilter import CandidatePrefilter
 from urlfinderlib.url import URLList
 
 
 class DataUrlFinder:
-    def __init__(self, blob: Union[bytes, str]):
+    def __init__(self, blob: Union[bytes, str], prefilter: CandidatePrefilter = None):
         if isinstance(blob, str):
             blob = blob.encode("utf-8", errors="ignore")
 
         self.blob = blob
+        self.prefilter = prefilter if prefilter is not None else CandidatePrefilter()
 
     def find_urls(self) -> Set[str]:
         tok = tokenizer.UTF8Tokenizer(self.blob)
@@ -19,8 +22,13 @@ class DataUrlFinder:
         ascii_strings_iter = tok.get_ascii_strings(length=8)
         possible_url_strings = {s for s in ascii_strings_iter if (":" in s or "/" in s) and "." in s}
 
+        budget = get_budget()
+
         urls = URLList()
         for possible_url_string in possible_url_strings:
-            urls += TextUrlFinder(possible_url_string).find_urls(strict=True)
+            if not budget.check():
+                break
+
+            urls += TextUrlFinder(possible_url_string, prefilter=self.prefilter).find_urls(strict=True)
 
         return set(urls)
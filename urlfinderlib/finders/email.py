@@ -0,0 +1,138 @@
+import contextvars
+import email.policy
+
+from concurrent.futures import Executor
+from email.message import Message
+from email.parser import BytesFeedParser
+from typing import Iterator, Optional, Set, Tuple, Union
+
+from urlfinderlib.budget import get_budget
+from urlfinderlib.urlfinderlib import _iter_finder_urls
+
+# The parser is fed the message in chunks of this size, checking the budget in between.
+CHUNK_SIZE = 64 * 1024
+
+# Parts of these types cannot contain URLs, so they are skipped without being decoded.
+SKIPPED_MAINTYPES = {"audio", "font", "image", "model", "video"}
+
+
+def get_part_mimetype(content_type: str) -> Optional[str]:
+    """Returns the mimetype that a part with the declared content type is dispatched with (an empty string means its
+    type has to be detected from its contents), or None if the part should be skipped"""
+
+    maintype, _, subtype = content_type.lower().partition("/")
+
+    if maintype in SKIPPED_MAINTYPES:
+        return None
+    elif "html" in subtype:
+        return "html"
+    elif subtype == "calendar":
+        return "vcalendar"
+    elif subtype == "xml" or subtype.endswith("+xml"):
+        return "xml"
+    elif maintype == "text":
+        return "text"
+
+    # e.g., application/octet-stream attachments
+    return ""
+
+
+def _find_part_urls(payload: Union[bytes, str], mimetype: str, base_url: str, domain_as_url: bool) -> Set[str]:
+    urls = set()
+    for finder_urls in _iter_finder_urls(payload, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url):
+        urls |= set(finder_urls)
+
+    return urls
+
+
+class EmailUrlFinder:
+    """Finds the URLs in an RFC 822 email by walking its MIME tree. Each part is decoded from its transfer encoding
+    (base64, quoted-printable, etc.) and sent to the finder for its declared Content-Type, so libmagic only has to
+    detect the type of generic attachments (e.g., application/octet-stream). Images, audio, video, and fonts are
+    skipped. If an executor is given, the parts are processed in parallel."""
+
+    def __init__(
+        self,
+        blob: Union[bytes, str],
+        base_url: str = "",
+        domain_as_url: bool = False,
+        executor: Optional[Executor] = None,
+    ):
+        if isinstance(blob, str):
+            blob = blob.encode("utf-8", errors="ignore")
+
+        self.blob = blob
+        self.base_url = base_url
+        self.domain_as_url = domain_as_url
+        self.executor = executor
+
+    def find_urls(self) -> Set[str]:
+        parts = list(self.iter_parts())
+
+        if self.executor is None:
+            results = [
+                _find_part_urls(payload, mimetype, self.base_url, self.domain_as_url) for payload, mimetype in parts
+            ]
+        else:
+            # Each part runs in a copy of the current context, so the budget and instrumentation still apply.
+            futures = [
+                self.executor.submit(
+                    contextvars.copy_context().run,
+                    _find_part_urls,
+                    payload,
+                    mimetype,
+                    self.base_url,
+                    self.domain_as_url,
+                )
+                for payload, mimetype in parts
+            ]
+            results = [future.result() for future in futures]
+
+        return set().union(*results)
+
+    def iter_parts(self) -> Iterator[Tuple[Union[bytes, str], str]]:
+        """Yields the decoded payload of each part that can contain URLs along with the mimetype to dispatch it with"""
+
+        budget = get_budget()
+
+        for part in self._parse().walk():
+            if not budget.check():
+                return
+
+            if part.is_multipart():
+                continue
+
+            mimetype = get_part_mimetype(part.get_content_type())
+            if mimetype is None:
+                continue
+
+            payload = part.get_payload(decode=True)
+            if not payload:
+                continue
+
+            yield self._decode_text(part, payload) if mimetype else payload, mimetype
+
+    def _parse(self) -> Message:
+        budget = get_budget()
+
+        parser = BytesFeedParser(policy=email.policy.compat32)
+        for i in range(0, len(self.blob), CHUNK_SIZE):
+            if not budget.check():
+                break
+
+            parser.feed(self.blob[i : i + CHUNK_SIZE])
+
+        return parser.close()
+
+    @staticmethod
+    def _decode_text(part: Message, payload: bytes) -> Union[bytes, str]:
+        """Decodes text parts from their declared charset (the finders otherwise assume UTF-8)"""
+
+        charset = part.get_content_charset()
+        if not charset or charset in ("utf-8", "us-ascii"):
+            return payload
+
+        try:
+            return payload.decode(charset, errors="ignore")
+        except LookupError:
+            return payload
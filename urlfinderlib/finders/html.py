@@ -13,6 +13,9 @@ import urlfinderlib.tokenizer as tokenizer
 
 from .text import TextUrlFinder
 from urlfinderlib import is_url
+from urlfinderlib.budget import get_budget
+from urlfinderlib.instrumentation import get_instrumentation
+from urlfinderlib.prefilter import CandidatePrefilter
 from urlfinderlib.url import URLList
 
 warnings.filterwarnings("ignore", category=UserWarning, module="bs4")
@@ -21,9 +24,10 @@ warnings.filterwarnings("ignore", category=UserWarning, module="bs4")
 def _build_tree(string: str) -> etree.Element:
     parser = etree.HTMLParser(encoding="utf-8", default_doctype=False)
 
-    tree = etree.parse(StringIO(string), parser=parser)
-    if tree.getroot() is None:
-        tree = etree.parse(StringIO("<html></html>"), parser=parser)
+    with get_instrumentation().stage("lxml_parse"):
+        tree = etree.parse(StringIO(string), parser=parser)
+        if tree.getroot() is None:
+            tree = etree.parse(StringIO("<html></html>"), parser=parser)
 
     return tree
 
@@ -48,11 +52,12 @@ def _remove_obfuscating_font_tags_from_tree(tree: etree.Element) -> None:
 
 
 class HtmlUrlFinder:
-    def __init__(self, blob: Union[bytes, str], base_url: str = ""):
+    def __init__(self, blob: Union[bytes, str], base_url: str = "", prefilter: CandidatePrefilter = None):
         if isinstance(blob, str):
             blob = blob.encode("utf-8", errors="ignore")
 
         self._base_url = base_url
+        self.prefilter = prefilter if prefilter is not None else CandidatePrefilter()
 
         utf8_string = helpers.remove_null_characters(blob.decode("utf-8", errors="ignore"))
         decoded_utf8_string = html.unescape(unquote(utf8_string))
@@ -62,17 +67,23 @@ class HtmlUrlFinder:
             self._strings.append(decoded_utf8_string)
 
     def find_urls(self) -> Set[str]:
+        budget = get_budget()
+
         urls = URLList()
         for string in self._strings:
-            urls += HtmlTreeUrlFinder(string, base_url=self._base_url).find_urls()
+            if not budget.check():
+                break
+
+            urls += HtmlTreeUrlFinder(string, base_url=self._base_url, prefilter=self.prefilter).find_urls()
 
         return set(urls)
 
 
 class HtmlTreeUrlFinder:
-    def __init__(self, string: str, base_url: str = ""):
+    def __init__(self, string: str, base_url: str = "", prefilter: CandidatePrefilter = None):
         self._base_url = None
         self._given_base_url = base_url
+        self.prefilter = prefilter if prefilter is not None else CandidatePrefilter()
         self._string = string
         self._tree = _build_tree(string)
 
@@ -88,6 +99,7 @@ class HtmlTreeUrlFinder:
         return unquote(etree.tostring(self._tree, encoding="unicode", method="html"))
 
     def find_urls(self) -> Set[str]:
+        budget = get_budget()
         valid_urls = URLList()
 
         for document_write_url in self._find_document_write_urls():
@@ -111,7 +123,7 @@ class HtmlTreeUrlFinder:
 
         possible_urls |= self._get_tag_attribute_values()
 
-        for possible_url in possible_urls:
+        for possible_url in budget.limit(self.prefilter.filter(possible_urls), "candidates"):
             valid_urls.append(helpers.fix_possible_url(possible_url))
 
         tok = tokenizer.UTF8Tokenizer(self.tree_string)
@@ -128,7 +140,7 @@ class HtmlTreeUrlFinder:
             tok.get_tokens_between_open_and_close_sequence("'FTP", "'", strict=True),
         )
 
-        for token in token_iter:
+        for token in budget.limit(self.prefilter.filter(token_iter), "candidates"):
             valid_urls.append(token)
 
         return set(valid_urls)
@@ -136,9 +148,14 @@ class HtmlTreeUrlFinder:
     def _find_document_write_urls(self) -> Set[str]:
         urls = URLList()
 
+        budget = get_budget()
+
         document_writes_contents = self._get_document_write_contents()
         for content in document_writes_contents:
-            new_parser = HtmlUrlFinder(content, base_url=self.base_url)
+            if not budget.check():
+                break
+
+            new_parser = HtmlUrlFinder(content, base_url=self.base_url, prefilter=self.prefilter)
             urls += new_parser.find_urls()
 
         return set(urls)
@@ -147,9 +164,14 @@ class HtmlTreeUrlFinder:
         visible_text = self._get_visible_text()
         possible_urls = {line for line in visible_text.splitlines() if "." in line and "/" in line}
 
+        budget = get_budget()
+
         urls = URLList()
         for possible_url in possible_urls:
-            urls += TextUrlFinder(possible_url).find_urls(strict=True)
+            if not budget.check():
+                break
+
+            urls += TextUrlFinder(possible_url, prefilter=self.prefilter).find_urls(strict=True)
 
         return set(urls)
 
@@ -1,19 +1,81 @@
-from icalendar import Calendar
-from typing import Set, Union
+import re
+
+from typing import Iterator, Set, Tuple, Union
 
 from .text import TextUrlFinder
+from urlfinderlib.budget import get_budget
 from urlfinderlib.url import URLList
 
 
-def _remove_lines_after_end(ical_text: str) -> str:
-    lines = ical_text.splitlines()
-    for i in range(len(lines) - 1, -1, -1):
-        if not lines[i].upper().startswith("END:"):
-            del lines[i]
-        else:
-            break
+# Only these VEVENT properties are scanned for URLs. The remaining properties (dates, UIDs, attendees, etc.) are
+# skipped without ever being unescaped.
+URL_PROPERTIES = {"ATTACH", "DESCRIPTION", "LOCATION", "URL", "X-ALT-DESC"}
+URL_PARAMETERS = {"ALTREP"}
+
+text_escape_pattern = re.compile(r"\\([\\;,nN])")
+text_escapes = {"\\": "\\", ";": ";", ",": ",", "n": "\n", "N": "\n"}
+
+
+def _iter_unfolded_lines(ical_text: str) -> Iterator[str]:
+    """Yields the logical content lines, joining any RFC 5545 folded (whitespace prefixed) continuation lines"""
+
+    current = []
+    for line in ical_text.splitlines():
+        if line[:1] in (" ", "\t") and current:
+            current.append(line[1:])
+            continue
+
+        if current:
+            yield "".join(current)
+
+        current = [line]
+
+    if current:
+        yield "".join(current)
+
+
+def _split_content_line(line: str) -> Tuple[str, str, str]:
+    """Splits a content line into its upper-cased name, its parameters, and its value"""
+
+    in_quotes = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            name, _, params = line[:i].partition(";")
+            return name.strip().upper(), params, line[i + 1 :]
+
+    return line.strip().upper(), "", ""
 
-    return "\n".join(lines)
+
+def _unescape_text(value: str) -> str:
+    return text_escape_pattern.sub(lambda m: text_escapes[m.group(1)], value)
+
+
+def get_vevent_values(ical_text: str) -> Iterator[str]:
+    """Scans the calendar in a single pass and yields the values of the URL-bearing VEVENT properties"""
+
+    components = []
+    for line in _iter_unfolded_lines(ical_text):
+        name, params, value = _split_content_line(line)
+
+        if name == "BEGIN":
+            components.append(value.strip().upper())
+        elif name == "END":
+            if components and components[-1] == value.strip().upper():
+                components.pop()
+        elif components and components[-1] == "VEVENT" and name in URL_PROPERTIES:
+            if "VALUE=BINARY" in params.upper():
+                continue
+
+            if value:
+                yield _unescape_text(value)
+
+            # The ALTREP parameter holds a URI pointing to an alternate representation of the property value.
+            for param in params.split(";"):
+                param_name, _, param_value = param.partition("=")
+                if param_name.strip().upper() in URL_PARAMETERS and param_value:
+                    yield param_value.strip('"')
 
 
 class IcalUrlFinder:
@@ -21,24 +83,16 @@ class IcalUrlFinder:
         if isinstance(blob, bytes):
             blob = blob.decode("utf-8", errors="ignore")
 
-        text = _remove_lines_after_end(blob)
-        blob = text.encode("utf-8", errors="ignore")
-
         self.blob = blob
 
     def find_urls(self) -> Set[str]:
-        urls = URLList()
+        budget = get_budget()
 
-        ical = Calendar.from_ical(self.blob)
-        for component in ical.walk():
-            if component.name == "VEVENT":
-                description = component.get("description")
-                location = component.get("location")
-
-                if description:
-                    urls += TextUrlFinder(description).find_urls(strict=True)
+        urls = URLList()
+        for value in set(get_vevent_values(self.blob)):
+            if not budget.check():
+                break
 
-                if location:
-                    urls += TextUrlFinder(location).find_urls(strict=True)
+            urls += TextUrlFinder(value).find_urls(strict=True)
 
         return set(urls)
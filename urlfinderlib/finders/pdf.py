@@ -6,6 +6,7 @@ from typing import Set, Union
 import urlfinderlib.tokenizer as tokenizer
 
 from .text import TextUrlFinder
+from urlfinderlib.budget import get_budget
 from urlfinderlib.url import URLList
 
 
@@ -41,8 +42,13 @@ class PdfUrlFinder:
             tok.get_tokens_between_open_and_close_sequence("'FTP", "'", strict=True),
         )
 
+        budget = get_budget()
+
         urls = URLList()
         for token in token_iter:
+            if not budget.check():
+                break
+
             token = token.replace("\\", "")
 
             # Since various characters in the PDF were replaced with spaces, we assume that there should not
@@ -1,69 +1,81 @@
-import validators
-
 from itertools import chain
 from typing import Set, Union
 
 import urlfinderlib.helpers as helpers
 import urlfinderlib.tokenizer as tokenizer
 
+from urlfinderlib.budget import get_budget
+from urlfinderlib.instrumentation import get_instrumentation
+from urlfinderlib.prefilter import CandidatePrefilter, is_domain
 from urlfinderlib.url import URLList
 
 
 class TextUrlFinder:
-    def __init__(self, blob: Union[bytes, str]):
+    def __init__(self, blob: Union[bytes, str], prefilter: CandidatePrefilter = None):
         if isinstance(blob, str):
             blob = blob.encode("utf-8", errors="ignore")
 
         self.blob = blob
+        self.prefilter = prefilter if prefilter is not None else CandidatePrefilter()
 
     def find_urls(self, strict: bool = True, domain_as_url: bool = False) -> Set[str]:
-        tok = tokenizer.UTF8Tokenizer(self.blob)
-
-        token_iter = chain(
-            tok.get_line_tokens(),
-            tok.get_tokens_between_angle_brackets(strict=strict),
-            tok.get_tokens_between_backticks(),
-            tok.get_tokens_between_brackets(strict=strict),
-            tok.get_tokens_between_curly_brackets(strict=strict),
-            tok.get_tokens_between_double_quotes(),
-            tok.get_tokens_between_parentheses(strict=strict),
-            tok.get_tokens_between_single_quotes(),
-            tok.get_sentences(),
-        )
-
-        split_token_iter = tok.get_split_tokens_after_replace(["<", ">", "`", "[", "]", "{", "}", '"', "'", "(", ")"])
-
-        if domain_as_url:
-            tokens = set()
-            for token in token_iter:
-                if "." in token and "/" in token:
-                    tokens.add(token)
-                    continue
-
-                if validators.domain(token):
-                    tokens.add(token)
-
-            for token in split_token_iter:
-                if "." in token and "/" in token:
-                    tokens.add(token)
-                    continue
-
-                if validators.domain(token):
-                    tokens.add(token)
-        else:
-            tokens = {t for t in token_iter if "." in t and "/" in t}
-            tokens |= {t for t in split_token_iter if "." in t and "/" in t}
-
-        valid_urls = URLList()
-        for token in tokens:
+        budget = get_budget()
+        instrumentation = get_instrumentation()
+
+        with instrumentation.stage("tokenize"):
+            tok = tokenizer.UTF8Tokenizer(self.blob)
+
+            token_iter = chain(
+                tok.get_line_tokens(),
+                tok.get_tokens_between_angle_brackets(strict=strict),
+                tok.get_tokens_between_backticks(),
+                tok.get_tokens_between_brackets(strict=strict),
+                tok.get_tokens_between_curly_brackets(strict=strict),
+                tok.get_tokens_between_double_quotes(),
+                tok.get_tokens_between_parentheses(strict=strict),
+                tok.get_tokens_between_single_quotes(),
+                tok.get_sentences(),
+            )
+
+            split_token_iter = tok.get_split_tokens_after_replace(
+                ["<", ">", "`", "[", "]", "{", "}", '"', "'", "(", ")"]
+            )
+
+            token_iter = budget.limit(token_iter, "tokens")
+            split_token_iter = budget.limit(split_token_iter, "tokens")
+
+            if domain_as_url:
+                # Gather and deduplicate the tokens from both iterators first so that each distinct bare domain is
+                # only checked once, no matter how many times it appears in the text.
+                tokens = {t for t in chain(token_iter, split_token_iter) if "." in t}
+                tokens = {t for t in tokens if "/" in t or is_domain(t)}
+            else:
+                tokens = {t for t in token_iter if "." in t and "/" in t}
+                tokens |= {t for t in split_token_iter if "." in t and "/" in t}
+
+        with instrumentation.stage("fix_possible_url"):
             # It is common for text files like email plaintext bodies to encode URLs in the form of:
             # http://domain.com<http://actualdomain.com>
             # where the text at the beginning is what will be displayed, and the text inside the <> is the
             # actual URL you will be taken to if you click on it. In these cases, we don't want that entire string
             # to be considered as a valid URL, but would rather have each of them as separate URLs.
-            if "<" in token and token.endswith(">"):
-                continue
+            possible_urls = [
+                helpers.fix_possible_url(token, domain_as_url=domain_as_url)
+                for token in budget.limit(self.prefilter.filter(tokens), "candidates")
+                if not ("<" in token and token.endswith(">"))
+            ]
+
+        valid_urls = URLList()
+        with instrumentation.stage("validate"):
+            # The candidates were already paid for, so only stop validating them if the time is up.
+            for possible_url in possible_urls:
+                if budget.timed_out():
+                    break
+
+                valid_urls.append(possible_url)
 
-            valid_urls.append(helpers.fix_possible_url(token, domain_as_url=domain_as_url))
+        instrumentation.count("tokens", len(tokens))
+        instrumentation.count("candidates", len(possible_urls))
+        instrumentation.count("accepted", len(valid_urls))
 
         return set(valid_urls)
@@ -2,6 +2,7 @@ from typing import Set, Union
 from xml.etree import cElementTree
 
 from .text import TextUrlFinder
+from urlfinderlib.budget import get_budget
 from urlfinderlib.url import URLList
 
 
@@ -20,8 +21,13 @@ class XmlUrlFinder:
         possible_urls |= {v for v in self._get_all_attribute_values() if v and "." in v and "/" in v}
         possible_urls |= {t for t in self._get_all_text() if t and "." in t and "/" in t}
 
+        budget = get_budget()
+
         urls = URLList()
         for possible_url in possible_urls:
+            if not budget.check():
+                break
+
             urls += TextUrlFinder(possible_url).find_urls(strict=True)
 
         return set(urls)
@@ -1,27 +1,74 @@
 import base64
-import validators
 
+from typing import Tuple, Union
 from urllib.parse import urlsplit
 
 
+# http://www.unicode.org/faq/unsup_char.html
+hidden_characters = ["\u200c", "\u200d", "\u200e", "\u00ad", "\u2060", "\ufeff", "\u200b", "\u2061", "\u115f"]
+hidden_characters_table = str.maketrans(dict.fromkeys(hidden_characters))
+
+
+def _validate_email(value: str) -> bool:
+    import validators
+
+    return validators.email(value)
+
+
 def build_url(scheme: str, netloc: str, path: str) -> str:
     return f"{scheme}://{netloc}{path}"
 
 
 def fix_possible_url(value: str, domain_as_url: bool = False) -> str:
-    value = fix_possible_value(value)
-    return value if validators.email(value) else prepend_missing_scheme(value, domain_as_url=domain_as_url)
+    value, scheme = _fix_possible_value(value)
+
+    if "@" in value and _validate_email(value):
+        return value
+
+    return _prepend_missing_scheme(value, scheme, domain_as_url=domain_as_url)
 
 
 def fix_possible_value(value: str) -> str:
-    value = value.strip()
-    value = remove_hidden_unicode_characters(value)
+    return _fix_possible_value(value)[0]
+
+
+def _fix_possible_value(value: str) -> Tuple[str, Union[str, None]]:
+    """Fused equivalent of strip, remove_hidden_unicode_characters, fix_slashes, fix_scheme,
+    remove_mailto_if_not_email_address, remove_null_characters, and remove_surrounding_quotes.
+
+    The value is split at most once. Along with the fixed value, this returns the scheme of the fixed value so that
+    prepend_missing_scheme does not have to split it again, or None if the fixed value needs to be split again.
+    """
+
+    value = value.strip().translate(hidden_characters_table)
     value = fix_slashes(value)
-    value = fix_scheme(value)
-    value = remove_mailto_if_not_email_address(value)
-    value = remove_null_characters(value)
-    value = remove_surrounding_quotes(value)
-    return value
+
+    scheme = ""
+    if _might_have_scheme_or_netloc(value):
+        try:
+            split_value = urlsplit(value)
+        except ValueError:
+            return "", ""
+
+        scheme = split_value.scheme
+        if scheme and not split_value.netloc and split_value.path:
+            value = f"{scheme}://{split_value.path.lstrip('/')}"
+            if scheme == "mailto":
+                value = remove_mailto_if_not_email_address(value)
+                scheme = None
+        elif scheme == "mailto" and not _is_email(split_value.path):
+            value = value[7:]
+            scheme = None
+
+    if "\u0000" in value:
+        value = remove_null_characters(value)
+        scheme = None
+
+    unquoted_value = remove_surrounding_quotes(value)
+    if unquoted_value != value:
+        return unquoted_value, None
+
+    return value, scheme
 
 
 def fix_scheme(value: str) -> str:
@@ -49,6 +96,10 @@ def get_ascii_url(url: str) -> str:
     return url.encode("ascii", errors="ignore").decode()
 
 
+def _is_email(value: str) -> bool:
+    return "@" in value and bool(_validate_email(value))
+
+
 def is_base64_ascii(value: str) -> bool:
     try:
         base64.b64decode(f"{value}===").decode("ascii")
@@ -62,6 +113,16 @@ def might_be_html(value: bytes) -> bool:
     return all(html_character in value for html_character in html_characters)
 
 
+def _might_have_scheme_or_netloc(value: str) -> bool:
+    """Returns False if urlsplit can neither find a scheme or netloc in the value nor raise a ValueError for it"""
+
+    if ":" in value or "//" in value:
+        return True
+
+    # urlsplit removes tabs and line breaks before parsing, which can turn "/\n/" into "//"
+    return "/" in value and ("\t" in value or "\r" in value or "\n" in value)
+
+
 def prepend_missing_scheme(value: str, domain_as_url: bool = False) -> str:
     value = value.lstrip(":/")
 
@@ -80,14 +141,25 @@ def prepend_missing_scheme(value: str, domain_as_url: bool = False) -> str:
     return value
 
 
-def remove_hidden_unicode_characters(value: str) -> str:
-    # http://www.unicode.org/faq/unsup_char.html
-    hidden_characters = ["\u200c", "\u200d", "\u200e", "\u00ad", "\u2060", "\ufeff", "\u200b", "\u2061", "\u115f"]
+def _prepend_missing_scheme(value: str, scheme: Union[str, None], domain_as_url: bool = False) -> str:
+    """Same as prepend_missing_scheme, but reuses the scheme found by _fix_possible_value when it is still valid"""
 
-    for hidden_character in hidden_characters:
-        value = value.replace(hidden_character, "")
+    stripped_value = value.lstrip(":/")
 
-    return value
+    if scheme is None or stripped_value != value:
+        if _might_have_scheme_or_netloc(stripped_value):
+            return prepend_missing_scheme(stripped_value, domain_as_url=domain_as_url)
+
+        scheme = ""
+
+    if not scheme and ("." if domain_as_url else "/") in stripped_value:
+        return f"https://{stripped_value}"
+
+    return stripped_value
+
+
+def remove_hidden_unicode_characters(value: str) -> str:
+    return value.translate(hidden_characters_table)
 
 
 def remove_surrounding_quotes(value: str) -> str:
@@ -103,7 +175,7 @@ def remove_mailto_if_not_email_address(value: str) -> str:
     except ValueError:
         return value
 
-    if split_value.scheme == "mailto" and not validators.email(split_value.path):
+    if split_value.scheme == "mailto" and not _validate_email(split_value.path):
         return value[7:]
 
     return value
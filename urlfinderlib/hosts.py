@@ -0,0 +1,180 @@
+import json
+import sys
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class HostCache:
+    """A bounded LRU cache of the properties that only depend on a URL's netloc (IDNA/Unicode forms, IP address and
+    localhost checks, TLD validity). It is shared by every URL instance, so the many permutation and child URLs built
+    from the same few hosts only compute these once."""
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, netloc: str, name: str, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(netloc)
+            if entry is None:
+                entry = self._entries[sys.intern(netloc)] = {}
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(netloc)
+
+            if name in entry:
+                self.hits += 1
+                return entry[name]
+
+        value = compute()
+        if isinstance(value, str):
+            value = sys.intern(value)
+
+        with self._lock:
+            self.misses += 1
+            entry[name] = value
+
+        return value
+
+
+class _HostSuffixTrieNode:
+    __slots__ = ("children", "exact_values", "suffix_values")
+
+    def __init__(self):
+        self.children: Dict[str, "_HostSuffixTrieNode"] = {}
+        self.exact_values: List[Any] = []
+        self.suffix_values: List[Any] = []
+
+
+class HostSuffixTrie:
+    """Maps hosts to values, keyed either by the exact host or by a host suffix that also matches every subdomain.
+    The host labels are stored in reverse order, so a lookup costs one dict access per label of the host."""
+
+    def __init__(self):
+        self._root = _HostSuffixTrieNode()
+
+    def add(self, host: str, value: Any, suffix: bool = True) -> None:
+        node = self._root
+        for label in reversed(_get_labels(host)):
+            node = node.children.setdefault(label, _HostSuffixTrieNode())
+
+        if suffix:
+            node.suffix_values.append(value)
+        else:
+            node.exact_values.append(value)
+
+    def get(self, host: str) -> List[Any]:
+        """Returns the values matching the host, with the most specific matches first"""
+
+        if not host:
+            return []
+
+        labels = _get_labels(host)
+        matches = []
+        node = self._root
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.children.get(labels[i])
+            if node is None:
+                break
+
+            matches.append(node.suffix_values)
+            if i == 0:
+                matches.append(node.exact_values)
+
+        return [value for values in reversed(matches) for value in values]
+
+
+class DomainFilter:
+    """Drops the URLs whose host is (or is a subdomain of) one of the excluded domains, or, if any domains are included,
+    every URL whose host is not one of the included domains.
+
+    The host of each candidate URL is checked as soon as it is split out of the candidate, so filtered URLs skip the
+    validation (IDNA, TLD, and format checks) and are never expanded into child URLs. Child URLs whose host is filtered
+    are dropped as well.
+    """
+
+    active = True
+
+    def __init__(self, include: Iterable[str] = None, exclude: Iterable[str] = None):
+        self.include = sorted({domain.lower().strip(".") for domain in include or []})
+        self.exclude = sorted({domain.lower().strip(".") for domain in exclude or []})
+
+        self._include = HostSuffixTrie()
+        for domain in self.include:
+            self._include.add(domain, True)
+
+        self._exclude = HostSuffixTrie()
+        for domain in self.exclude:
+            self._exclude.add(domain, True)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the filter's domains, e.g. to tell apart cached results that were found with different filters"""
+
+        return json.dumps({"include": self.include, "exclude": self.exclude})
+
+    def allows(self, host: Optional[str]) -> bool:
+        if not host:
+            return not self.include
+
+        if self._exclude.get(host):
+            return False
+
+        return not self.include or bool(self._include.get(host))
+
+
+class NullDomainFilter(DomainFilter):
+    """The filter used when none was given. It allows every host."""
+
+    active = False
+
+    def allows(self, host: Optional[str]) -> bool:
+        return True
+
+
+_current_domain_filter: ContextVar[DomainFilter] = ContextVar("urlfinderlib_domain_filter", default=NullDomainFilter())
+
+
+def get_domain_filter() -> DomainFilter:
+    return _current_domain_filter.get()
+
+
+@contextmanager
+def use_domain_filter(domain_filter: DomainFilter) -> Iterator[DomainFilter]:
+    """Filters every URL found in the block (in the current thread or asyncio task) with the given filter"""
+
+    token = _current_domain_filter.set(domain_filter)
+    try:
+        yield domain_filter
+    finally:
+        _current_domain_filter.reset(token)
+
+
+def _get_labels(host: str) -> List[str]:
+    return host.lower().rstrip(".").split(".")
+
+
+host_cache = HostCache()
@@ -0,0 +1,79 @@
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, ContextManager, Dict, Iterator
+
+
+class Instrumentation:
+    """Records the wall time spent in each stage of finding URLs along with counters of the work that was done.
+
+    Stages can be nested (e.g., "finder.HtmlUrlFinder" contains the "lxml_parse" stages of the HTML finder), so each
+    timing includes the time of the stages nested inside of it. If a callback is given, it is called with the name and
+    duration (in seconds) of every stage as it finishes, which makes it easy to export the timings to a metrics system.
+    """
+
+    enabled = True
+
+    def __init__(self, callback: Callable[[str, float], None] = None):
+        self.callback = callback
+
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {"timings": dict(self.timings), "calls": dict(self.calls), "counters": dict(self.counters)}
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] += elapsed
+            self.calls[name] += 1
+
+            if self.callback:
+                self.callback(name, elapsed)
+
+
+class NullInstrumentation(Instrumentation):
+    """The instrumentation used when none was given. It records nothing, so leaving the hooks in costs next to nothing."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+        self._null_stage = nullcontext()
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return self._null_stage
+
+
+_current_instrumentation: ContextVar[Instrumentation] = ContextVar(
+    "urlfinderlib_instrumentation", default=NullInstrumentation()
+)
+
+
+def get_instrumentation() -> Instrumentation:
+    return _current_instrumentation.get()
+
+
+@contextmanager
+def use_instrumentation(instrumentation: Instrumentation) -> Iterator[Instrumentation]:
+    """Records everything done in the block (in the current thread or asyncio task) with the given instrumentation"""
+
+    token = _current_instrumentation.set(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        _current_instrumentation.reset(token)
@@ -0,0 +1,115 @@
+import base64
+import binascii
+import html
+import re
+
+from functools import lru_cache
+from typing import Callable, Iterator, List, Set, Tuple
+from urllib.parse import unquote
+
+
+# Tracking links can wrap the destination URL in several layers of encoding (e.g., base64 of a percent-encoded URL).
+# Each layer is unwrapped breadth-first, but never deeper than this or into more payloads than this per value.
+MAX_DEPTH = 4
+MAX_PAYLOADS = 256
+
+# The base64 strings we want are usually preceeded by a character in the URL such as: ", ', #, /, or =
+# If these were not at the beginning of the regex statement, we would find additional URLs, but they
+# are often malformed when decoded, as they are buried inside of a larger URL encoding scheme.
+# "aHR0c" and "ZnRw" are what "http" and "ftp" look like once they are base64 encoded.
+base64_pattern = re.compile(r"(?<=[\"\'\#\/=])(?:aHR0c|ZnRw)[a-zA-Z0-9_-]+")
+base64_standard_pattern = re.compile(r"[a-zA-Z0-9]+")
+
+# "68747470" and "667470" are what "http" and "ftp" look like once they are hex encoded.
+hex_pattern = re.compile(r"(?<![0-9a-fA-F])(?:68747470|667470)(?:[0-9a-fA-F]{2})+")
+
+# A URL whose "://" is percent-encoded at least once. Any "&" in it belongs to the outer URL.
+percent_pattern = re.compile(r"(?:https?|ftp)%(?:25)*3[aA][^\s\"\'<>&]*", re.IGNORECASE)
+
+# A run of characters that may contain HTML entities. The alternatives start with different characters, so the
+# pattern never backtracks into the run.
+html_entity_run_pattern = re.compile(r"(?:&#[xX]?[0-9a-fA-F]{1,6};?|&[a-zA-Z]{2,8};|[^\s\"\'<>&])+")
+url_start_pattern = re.compile(r"(?:https?|ftp):", re.IGNORECASE)
+
+
+def _decode_base64(fragment: str) -> Iterator[str]:
+    for match in base64_pattern.finditer(fragment):
+        payload = match.group(0)
+
+        # Only the standard alphabet used to be decoded, so keep decoding the value up to the first URL-safe character.
+        standard_payload = base64_standard_pattern.match(payload).group(0)
+        try:
+            yield base64.b64decode(f"{standard_payload}===").decode("ascii")
+        except (binascii.Error, UnicodeDecodeError):
+            pass
+
+        if standard_payload != payload:
+            try:
+                yield base64.urlsafe_b64decode(f"{payload}===").decode("ascii")
+            except (binascii.Error, UnicodeDecodeError):
+                pass
+
+
+def _decode_hex(fragment: str) -> Iterator[str]:
+    for match in hex_pattern.finditer(fragment):
+        try:
+            yield bytes.fromhex(match.group(0)).decode("ascii")
+        except UnicodeDecodeError:
+            pass
+
+
+def _decode_html_entities(fragment: str) -> Iterator[str]:
+    if "&" not in fragment:
+        return
+
+    for match in html_entity_run_pattern.finditer(fragment):
+        if "&" not in match.group(0):
+            continue
+
+        decoded = html.unescape(match.group(0))
+        url_start = url_start_pattern.search(decoded)
+        if url_start:
+            yield decoded[url_start.start() :]
+
+
+def _decode_percent(fragment: str) -> Iterator[str]:
+    if "%" not in fragment:
+        return
+
+    for match in percent_pattern.finditer(fragment):
+        yield unquote(match.group(0))
+
+
+decoders: List[Callable[[str], Iterator[str]]] = [_decode_base64, _decode_hex, _decode_percent, _decode_html_entities]
+
+
+@lru_cache(maxsize=4096)
+def decode_fragment(fragment: str) -> Tuple[str, ...]:
+    """Unwraps a single layer of encoding from every payload found in the fragment"""
+
+    return tuple(dict.fromkeys(payload for decoder in decoders for payload in decoder(fragment) if payload))
+
+
+def decode_payloads(value: str, max_depth: int = MAX_DEPTH, max_payloads: int = MAX_PAYLOADS) -> Set[str]:
+    """Returns the payloads found by unwrapping the nested encoding layers in the value, one layer at a time"""
+
+    payloads = set()
+    layer = [value]
+
+    for _ in range(max_depth):
+        next_layer = []
+
+        for fragment in layer:
+            for payload in decode_fragment(fragment):
+                if payload in payloads:
+                    continue
+
+                if len(payloads) >= max_payloads:
+                    return payloads
+
+                payloads.add(payload)
+                next_layer.append(payload)
+
+        layer = next_layer
+
+    return payloads
@@ -0,0 +1,86 @@
+import re
+
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator
+
+
+# Tokens shorter than the shortest possible host ("a.co") or longer than any URL we are willing to validate never
+# make it to the expensive URL validation.
+MIN_CANDIDATE_LENGTH = 4
+MAX_CANDIDATE_LENGTH = 16384
+
+# A label followed by a dot and something that could be a TLD. The TLD candidate is checked against the public suffix
+# list afterwards, since a regex alternation of ~1,600 TLDs is far slower than a set lookup.
+tld_candidate_pattern = re.compile(r"(?<=[A-Za-z0-9-])\.([A-Za-z][A-Za-z0-9-]{1,62})(?![A-Za-z0-9-])")
+ipv4_pattern = re.compile(r"(?<![0-9])[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}(?![0-9])")
+
+# The same bare domain pattern that validators.domain uses, but compiled for fullmatch and without the IDNA
+# encoding step for the (far more common) ASCII tokens.
+domain_pattern = re.compile(
+    r"(?:[a-zA-Z0-9](?:[a-zA-Z0-9-_]{0,61}[A-Za-z0-9])?\.)+[A-Za-z0-9][A-Za-z0-9-_]{0,61}[A-Za-z]"
+)
+
+
+@lru_cache(maxsize=1)
+def get_tlds() -> FrozenSet[str]:
+    """Returns the lowercase set of top-level labels from the same public suffix list used to validate URLs"""
+
+    from tld.utils import get_tld_names, MozillaTLDSourceParser
+
+    tld_names = get_tld_names()
+    return frozenset(tld_names[MozillaTLDSourceParser.local_path].root.children)
+
+
+def is_domain(value: str) -> bool:
+    """Returns True if the value is a bare domain name that ends with a known TLD"""
+
+    if not value.isascii():
+        try:
+            value = value.encode("idna").decode("ascii")
+        except UnicodeError:
+            return False
+
+    if not domain_pattern.fullmatch(value):
+        return False
+
+    return value[value.rfind(".") + 1 :].lower() in get_tlds()
+
+
+def has_known_tld(value: str) -> bool:
+    tlds = get_tlds()
+    return any(match.lower() in tlds for match in tld_candidate_pattern.findall(value))
+
+
+class CandidatePrefilter:
+    """Cheaply rejects tokens that cannot possibly become valid URLs before they are fixed up and validated.
+
+    The prefilter is intentionally conservative: any token containing characters that the URL fixing process
+    strips or converts (non-ASCII, null characters) or a "localhost" host is always passed through.
+    """
+
+    def __init__(self, min_length: int = MIN_CANDIDATE_LENGTH, max_length: int = MAX_CANDIDATE_LENGTH):
+        self.min_length = min_length
+        self.max_length = max_length
+
+        self.discarded = 0
+        self.passed = 0
+
+    def filter(self, tokens: Iterable[str]) -> Iterator[str]:
+        return (token for token in tokens if self.is_candidate(token))
+
+    def is_candidate(self, token: str) -> bool:
+        if self._is_candidate(token):
+            self.passed += 1
+            return True
+
+        self.discarded += 1
+        return False
+
+    def _is_candidate(self, token: str) -> bool:
+        if not self.min_length <= len(token) <= self.max_length:
+            return False
+
+        if not token.isascii() or "\x00" in token or "localhost" in token.lower():
+            return True
+
+        return has_known_tld(token) or bool(ipv4_pattern.search(token))
@@ -0,0 +1,48 @@
+from typing import Callable, List, TYPE_CHECKING
+
+from urlfinderlib.hosts import HostSuffixTrie
+
+if TYPE_CHECKING:  # pragma: no cover
+    from urlfinderlib.url import URL
+
+
+# A decoder receives the wrapping URL and returns the URL it redirects to, or an empty string if it cannot decode it.
+Decoder = Callable[["URL"], str]
+
+
+class RedirectorRegistry:
+    """Decoders for redirector and URL wrapping services (link trackers, URL rewriting security gateways, etc.), indexed
+    by host so that each URL only needs a single lookup to find the decoders that apply to it."""
+
+    def __init__(self):
+        self._decoders = HostSuffixTrie()
+
+    def get_decoders(self, hostname: str) -> List[Decoder]:
+        return self._decoders.get(hostname)
+
+    def register(self, host: str, decoder: Decoder, suffix: bool = True) -> None:
+        """Registers a decoder for the host. If suffix is True, the decoder also applies to every subdomain of the host."""
+
+        self._decoders.add(host, decoder, suffix=suffix)
+
+
+def _decode_mandrillapp(url: "URL") -> str:
+    return url.decode_mandrillapp() if url.is_mandrillapp else ""
+
+
+def _decode_proofpoint_v2(url: "URL") -> str:
+    return url.decode_proofpoint_v2() if url.is_proofpoint_v2 else ""
+
+
+def _decode_proofpoint_v3(url: "URL") -> str:
+    return url.decode_proofpoint_v3() if url.is_proofpoint_v3 else ""
+
+
+redirectors = RedirectorRegistry()
+register_redirector = redirectors.register
+
+register_redirector("mandrillapp.com", _decode_mandrillapp)
+
+for _proofpoint_host in ("urldefense.com", "urldefense.proofpoint.com"):
+    register_redirector(_proofpoint_host, _decode_proofpoint_v2)
+    register_redirector(_proofpoint_host, _decode_proofpoint_v3)
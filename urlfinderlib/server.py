@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+from urlfinderlib.aio import AsyncUrlFinder
+from urlfinderlib.url import URLSet
+from urlfinderlib.urlfinderlib import warmup
+
+# Every message starts with its length as a 4 byte big-endian unsigned integer.
+LENGTH = struct.Struct(">I")
+MAX_HEADER_SIZE = 64 * 1024
+MAX_DOCUMENT_SIZE = 64 * 1024 * 1024
+MAX_PIPELINE = 64
+
+REQUEST_OPTIONS = ("base_url", "mimetype", "domain_as_url", "timeout")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def pack_message(message: Dict[str, Any]) -> bytes:
+    data = json.dumps(message).encode("utf-8")
+    return LENGTH.pack(len(data)) + data
+
+
+def pack_request(blob: Union[bytes, str], request_id: Any = None, **options) -> bytes:
+    """Returns a request for the URLs in the blob: a length-prefixed JSON header followed by the raw document. The
+    header holds the request id, the size of the document, and the find_urls options."""
+
+    if isinstance(blob, str):
+        blob = blob.encode("utf-8")
+
+    header = {"id": request_id, "size": len(blob)}
+    header.update({key: value for key, value in options.items() if key in REQUEST_OPTIONS})
+    return pack_message(header) + blob
+
+
+async def read_request(reader: asyncio.StreamReader, max_document_size: int = MAX_DOCUMENT_SIZE) -> Tuple[dict, bytes]:
+    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    if length > MAX_HEADER_SIZE:
+        raise ProtocolError(f"header is too large ({length} bytes)")
+
+    try:
+        header = json.loads(await reader.readexactly(length))
+        size = int(header["size"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ProtocolError(f"invalid header: {e}")
+
+    if not 0 <= size <= max_document_size:
+        raise ProtocolError(f"invalid document size ({size} bytes)")
+
+    return header, await reader.readexactly(size)
+
+
+class UrlFinderServer:
+    """Finds the URLs in documents sent over a Unix domain socket or a localhost TCP port, so that a long-running
+    process pays the import and start up costs once instead of once per document.
+
+    Each request is a length-prefixed JSON header ({"id": ..., "size": ..., plus any of the find_urls options
+    base_url, mimetype, domain_as_url, and timeout}) followed by the raw document. Each response is a length-prefixed
+    JSON object with the request id and either the sorted "urls" (along with "partial" and "reason") or an "error".
+    Clients can pipeline requests without waiting for the responses, which are sent as soon as they are ready and so
+    can arrive out of order. Any number of clients can connect at the same time, and all of their documents share the
+    finder's worker pool.
+    """
+
+    def __init__(
+        self,
+        finder: AsyncUrlFinder,
+        socket_path: str = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_pipeline: int = MAX_PIPELINE,
+        max_document_size: int = MAX_DOCUMENT_SIZE,
+    ):
+        self.finder = finder
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.max_pipeline = max_pipeline
+        self.max_document_size = max_document_size
+
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        return self._server.sockets[0].getsockname()
+
+    async def start(self) -> None:
+        if self.socket_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=self.host, port=self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+
+        logging.info(f"serving on {self.address}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+            if self.socket_path:
+                with suppress(FileNotFoundError):
+                    os.unlink(self.socket_path)
+
+        await self.finder.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        pipeline = asyncio.Semaphore(self.max_pipeline)
+        tasks: Set[asyncio.Task] = set()
+
+        try:
+            while True:
+                try:
+                    request, blob = await read_request(reader, self.max_document_size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ProtocolError as e:
+                    await self._send(writer, lock, {"id": None, "error": f"ProtocolError: {e}"})
+                    break
+
+                # Stop reading once too many requests are in flight, which applies backpressure to the client.
+                await pipeline.acquire()
+                task = asyncio.create_task(self._respond(request, blob, writer, lock, pipeline))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(
+        self,
+        request: Dict[str, Any],
+        blob: bytes,
+        writer: asyncio.StreamWriter,
+        lock: asyncio.Lock,
+        pipeline: asyncio.Semaphore,
+    ) -> None:
+        self.requests += 1
+        options = {key: request[key] for key in REQUEST_OPTIONS if request.get(key) is not None}
+
+        try:
+            urls = await self.finder.find_urls(blob, **options)
+            response = {"id": request.get("id"), "urls": sorted(urls), "partial": urls.partial, "reason": urls.reason}
+        except Exception as e:
+            response = {"id": request.get("id"), "error": f"{type(e).__name__}: {e}"}
+        finally:
+            pipeline.release()
+
+        await self._send(writer, lock, response)
+
+    async def _send(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, response: Dict[str, Any]) -> None:
+        async with lock:
+            with suppress(ConnectionError):
+                writer.write(pack_message(response))
+                await writer.drain()
+
+
+class UrlFinderClient:
+    """A blocking client for UrlFinderServer. Use find_urls for one document at a time, or send several requests and
+    then receive their responses (matching them up by id) to pipeline them."""
+
+    def __init__(self, socket_path: str = None, host: str = "127.0.0.1", port: int = None, timeout: float = None):
+        if socket_path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+
+        self._file = self._socket.makefile("rb")
+        self._next_id = 0
+
+    def __enter__(self) -> "UrlFinderClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def find_urls(self, blob: Union[bytes, str], **options) -> URLSet:
+        self.send(blob, **options)
+        response = self.receive()
+
+        if "error" in response:
+            raise RuntimeError(response["error"])
+
+        return URLSet(response["urls"], partial=response["partial"], reason=response["reason"])
+
+    def receive(self) -> Dict[str, Any]:
+        data = self._file.read(LENGTH.size)
+        if len(data) < LENGTH.size:
+            raise ConnectionError("the server closed the connection")
+
+        (length,) = LENGTH.unpack(data)
+        return json.loads(self._file.read(length))
+
+    def send(self, blob: Union[bytes, str], request_id: Any = None, **options) -> Any:
+        """Sends a request without waiting for its response and returns its id"""
+
+        if request_id is None:
+            self._next_id += 1
+            request_id = self._next_id
+
+        self._socket.sendall(pack_request(blob, request_id=request_id, **options))
+        return request_id
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="urlfinder serve", description="Find the URLs in documents sent to a socket.")
+    parser.add_argument("--socket", metavar="PATH", help="listen on this Unix domain socket")
+    parser.add_argument("--host", default="127.0.0.1", help="listen on this host (defaults to localhost)")
+    parser.add_argument("--port", type=int, default=8585, help="listen on this TCP port")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--max-pipeline", type=int, default=MAX_PIPELINE, help="requests in flight per connection")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debugging information")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(name)s.%(funcName)s +%(lineno)s: %(levelname)-8s %(message)s",
+    )
+
+    async def serve() -> None:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=warmup) as executor:
+            # Start the worker processes now rather than when the first document arrives.
+            await asyncio.get_running_loop().run_in_executor(executor, int)
+
+            finder = AsyncUrlFinder(executor=executor, max_concurrency=args.workers)
+            server = UrlFinderServer(
+                finder, socket_path=args.socket, host=args.host, port=args.port, max_pipeline=args.max_pipeline
+            )
+            await server.serve_forever()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+
+    return 0
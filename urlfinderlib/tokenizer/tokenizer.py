@@ -2,6 +2,8 @@ import re
 
 from typing import Iterator, List, Union
 
+from urlfinderlib.budget import get_budget
+
 
 class UTF8Tokenizer:
     def __init__(self, blob: Union[bytes, str]):
@@ -46,11 +48,16 @@ class UTF8Tokenizer:
     def get_tokens_between_open_and_close_sequence(
         self, open_sequence: str, close_sequence: str, strict: bool = True
     ) -> Iterator[str]:
+        budget = get_budget()
+
         open_indices = self._get_indices_of_sequence(open_sequence)
         closed_indices = self._get_indices_of_sequence(close_sequence)
 
         index_pairs = []
         for open_index, open_value in enumerate(open_indices):
+            if not budget.check():
+                break
+
             for closed_value in closed_indices[:]:
                 if open_value < closed_value:
                     index_pairs.append((open_value, closed_value))
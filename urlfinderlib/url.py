@@ -5,20 +5,39 @@ import idna
 import ipaddress
 import json
 import re
-import tld
-import validators
 import string
 from collections import UserList
-from typing import AnyStr, Dict, List, Set, Union
+from typing import AnyStr, Dict, Iterable, List, Optional, Set, Union
 from urllib.parse import parse_qs, quote, unquote, urlparse, urlsplit, ParseResult, SplitResult
 
 import urlfinderlib.helpers as helpers
 
+from urlfinderlib.budget import get_budget
+from urlfinderlib.hosts import get_domain_filter, host_cache
+from urlfinderlib.instrumentation import get_instrumentation
+from urlfinderlib.payloads import decode_payloads
+from urlfinderlib.redirectors import redirectors
 
-# The base64 strings we want are usually preceeded by a character in the URL such as: ", ', #, or /
-# If these were not at the beginning of the regex statement, we would find additional URLs, but they
-# are often malformed when decoded, as they are buried inside of a larger URL encoding scheme.
-base64_pattern = re.compile(r"[\"\'\#\/](((aHR0c)|(ZnRw))[a-zA-Z0-9]+)")
+
+proofpoint_v3_pattern = re.compile(r"__(.+?)__;(.*?)!")
+
+# Find "*" but not "**" (a single replaced character) or "**A", "**B", ..., "**-", "**_" (a run of replaced bytes)
+proofpoint_v3_token_pattern = re.compile(r"(?<!\*)\*(?!\*)|\*{2}[A-Za-z0-9\-_]")
+
+# The number of bytes replaced by each "**X" token: "A" is 2 bytes, "B" is 3 bytes, ..., "_" is 65 bytes.
+proofpoint_v3_run_lengths = {
+    char: length for length, char in enumerate(string.ascii_uppercase + string.ascii_lowercase + string.digits + "-_", 2)
+}
+
+
+class URLSet(set):
+    """The URLs found in a document. If the search ran out of budget and stopped early, partial is True and reason is
+    what ran out ("timeout", "tokens", "candidates", or "children")."""
+
+    def __init__(self, urls: Iterable[str] = (), partial: bool = False, reason: Optional[str] = None):
+        super().__init__(urls)
+        self.partial = partial
+        self.reason = reason
 
 
 # TODO: Change this to inherit from a set
@@ -36,18 +55,35 @@ class URLList(UserList):
             value = URL(value)
 
         if isinstance(value, URL):
+            domain_filter = get_domain_filter()
+            if not domain_filter.allows(value.split_value.hostname):
+                get_instrumentation().count("filtered")
+                return
+
             if value.is_url:
                 self.data.append(value)
             elif value.is_url_ascii:
-                self.data.append(URL(helpers.get_ascii_url(value.value)))
+                ascii_url = URL(helpers.get_ascii_url(value.value))
+                if domain_filter.allows(ascii_url.split_value.hostname):
+                    self.data.append(ascii_url)
 
     def get_all_urls(self) -> Set[str]:
         if self.data:
+            budget = get_budget()
+            instrumentation = get_instrumentation()
+
             all_urls = []
             stack = self.data[:]
             while stack:
                 url = stack.pop()
+                if not budget.spend("children"):
+                    # The URL itself was already found, only its children are left unexpanded.
+                    all_urls.append(url.value)
+                    all_urls.extend(u.value for u in stack)
+                    break
+
                 all_urls.append(url.value)
+                instrumentation.count("children", len(url.child_urls))
                 for child_url in url.child_urls:
                     stack.append(child_url)
 
@@ -163,39 +199,25 @@ class URL:
     @property
     def is_netloc_ipv4(self) -> bool:
         if self._is_netloc_ipv4 is None:
-            if not self.split_value.hostname:
-                self._is_netloc_ipv4 = False
-            else:
-                try:
-                    ipaddress.ip_address(self.split_value.hostname)
-                    self._is_netloc_ipv4 = True
-                    return self._is_netloc_ipv4
-                except ValueError:
-                    self._is_netloc_ipv4 = False
-                    return self._is_netloc_ipv4
+            self._is_netloc_ipv4 = host_cache.get(self.split_value.netloc, "is_ipv4", self._get_is_netloc_ipv4)
 
         return self._is_netloc_ipv4
 
     @property
     def is_netloc_localhost(self) -> bool:
         if self._is_netloc_localhost is None:
-            if not self.split_value.hostname:
-                self._is_netloc_localhost = False
-            else:
-                self._is_netloc_localhost = (
-                    self.split_value.hostname.lower() == "localhost"
-                    or self.split_value.hostname.lower() == "localhost.localdomain"
-                )
+            self._is_netloc_localhost = host_cache.get(
+                self.split_value.netloc, "is_localhost", self._get_is_netloc_localhost
+            )
 
         return self._is_netloc_localhost
 
     @property
     def is_netloc_valid_tld(self) -> bool:
         if self._is_netloc_valid_tld is None:
-            try:
-                self._is_netloc_valid_tld = bool(tld.get_tld(self.value, fail_silently=True))
-            except:
-                self._is_netloc_valid_tld = False
+            self._is_netloc_valid_tld = host_cache.get(
+                self.split_value.netloc, "is_valid_tld", self._get_is_netloc_valid_tld
+            )
 
         return self._is_netloc_valid_tld
 
@@ -245,6 +267,9 @@ class URL:
             if not re.match(r"^[a-zA-Z0-9\-\.\:\@]{1,255}$", self.netloc_idna):
                 return False
 
+            # validators compiles its (large) URL pattern when it is imported, so it is imported on first use.
+            import validators
+
             encoded_url = helpers.build_url(self.split_value.scheme, self.netloc_idna, self.path_percent_encoded)
             self._is_valid_format = bool(validators.url(encoded_url))
 
@@ -253,23 +278,7 @@ class URL:
     @property
     def netloc_idna(self) -> str:
         if self._netloc_idna is None:
-            if all(ord(char) < 128 for char in self.split_value.netloc):
-                self._netloc_idna = self.split_value.netloc.lower()
-                return self._netloc_idna
-
-            try:
-                idna_hostname = idna.encode(self.split_value.hostname).decode("utf-8").lower()
-                self._netloc_idna = self.split_value.netloc.replace(self.split_value.hostname, idna_hostname)
-                return self._netloc_idna
-            except idna.core.IDNAError:
-                try:
-                    idna_hostname = self.split_value.hostname.encode("idna").decode("utf-8", errors="ignore").lower()
-                    self._netloc_idna = self.split_value.netloc.replace(self.split_value.hostname, idna_hostname)
-                    return self._netloc_idna
-                except UnicodeError:
-                    self._netloc_idna = ""
-
-            self._netloc_idna = ""
+            self._netloc_idna = host_cache.get(self.split_value.netloc, "netloc_idna", self._get_netloc_idna)
 
         return self._netloc_idna
 
@@ -283,16 +292,7 @@ class URL:
     @property
     def netloc_unicode(self) -> str:
         if self._netloc_unicode is None:
-            if any(ord(char) >= 128 for char in self.split_value.netloc):
-                self._netloc_unicode = self.split_value.netloc.lower()
-                return self._netloc_unicode
-
-            try:
-                self._netloc_unicode = idna.decode(self.split_value.netloc).lower()
-                return self._netloc_unicode
-            except idna.core.IDNAError:
-                self._netloc_unicode = self.split_value.netloc.encode("utf-8", errors="ignore").decode("idna").lower()
-                return self._netloc_unicode
+            self._netloc_unicode = host_cache.get(self.split_value.netloc, "netloc_unicode", self._get_netloc_unicode)
 
         return self._netloc_unicode
 
@@ -452,232 +452,103 @@ class URL:
             return ""
 
 
-    def decode_proofpoint_v3(self, unquote_url=False):
-        replacement_str_mapping = {
-            "A": 2,
-            "B": 3,
-            "C": 4,
-            "D": 5,
-            "E": 6,
-            "F": 7,
-            "G": 8,
-            "H": 9,
-            "I": 10,
-            "J": 11,
-            "K": 12,
-            "L": 13,
-            "M": 14,
-            "N": 15,
-            "O": 16,
-            "P": 17,
-            "Q": 18,
-            "R": 19,
-            "S": 20,
-            "T": 21,
-            "U": 22,
-            "V": 23,
-            "W": 24,
-            "X": 25,
-            "Y": 26,
-            "Z": 27,
-            "a": 28,
-            "b": 29,
-            "c": 30,
-            "d": 31,
-            "e": 32,
-            "f": 33,
-            "g": 34,
-            "h": 35,
-            "i": 36,
-            "j": 37,
-            "k": 38,
-            "l": 39,
-            "m": 40,
-            "n": 41,
-            "o": 42,
-            "p": 43,
-            "q": 44,
-            "r": 45,
-            "s": 46,
-            "t": 47,
-            "u": 48,
-            "v": 49,
-            "w": 50,
-            "x": 51,
-            "y": 52,
-            "z": 53,
-            "0": 54,
-            "1": 55,
-            "2": 56,
-            "3": 57,
-            "4": 58,
-            "5": 59,
-            "6": 60,
-            "7": 61,
-            "8": 62,
-            "9": 63,
-            "-": 64,
-            "_": 65,
-        }
-        # we don't use urlparse here because the mangled url confuses the function
-        # (e.g., it's not sure if the query belongs to the inner or our URL)
-        parsed_url = self.value
-
-        # extract URL between `__`s (e.g., /v3/__https://www.example.com__;Iw!![organization_id]![unique_identifier]$)
-        p = re.compile("__(.*)__;(.*)!!")
-        ps = p.search(parsed_url)
-
-        if ps is None:
-            # return as is
-            return parsed_url
-
-        url = ps.group(1)
-
-        # get string of b64-encoded replacement characters (e.g., "Iw" in  /v3/__https://www.example.com__;Iw!![organization_id]![unique_identifier]$)
-        replacement_b64 = ps.group(2)
-
-        # if the replacement string is empty, return extracted URL
-        if len(replacement_b64) == 0:
-            return url
-
-        # base64 decode replacement string
-        #
-        # use `urlsafe_b64decode` as the base64-encoded string
-        # uses - and _ instead of + and /, respectively.
-        #
-        # See Section 5 in RFC4648
-        # <https://www.rfc-editor.org/rfc/rfc4648.html#page-7>.
-        replacement_str = (base64.urlsafe_b64decode(replacement_b64 + "==")).decode(
-            "utf-8"
-        )  # b64decode ignores any extra padding
-
-        # replace `*` with actual symbols
-        replacement_list = list(replacement_str)
-        url_list = list(url)
-
-        offset = 0
-        save_bytes = 0
-        # this regex says: find ("*" but not "**") or ("**A", "**B", "**C", ..., "**-", "**_")
-        for m in re.finditer(r"(?<!\*)\*(?!\*)|\*{2}[A-Za-z0-9-_]", url):
-
-            if m.group(0) == "*":
-                # we only need to replace one character here
-                url_list[m.start() + offset] = replacement_list.pop(0)
-            elif m.group(0).startswith("**"):
-                # we need to replace a certain number of bytes
-                # e.g., "foobar**Dfoo" --> "foobar#####foo"
-                num_bytes = replacement_str_mapping[m.group(0)[-1]]
-
-                if save_bytes != 0:
-                    num_bytes += save_bytes
-                    save_bytes = 0  # reset
-
-
-                # replace "**[A-Za-z0-9-_]" with replacement characters
-                replacement_chars = list()
-
-                i = 0
-                while i < num_bytes:
-                    # previously we assumed that the replacement_str_mapping
-                    # referred to the number of characters, but it actually
-                    # represents the number of bytes to copy over, given the UTF-8
-                    # encoding. so we replace the for loop with a while loop and
-                    # increment a counter with the size of each character being
-                    # replaced.
-                    replacement_char = replacement_list.pop(0)
-                    replacement_chars.append(replacement_char)
-                    i += len(replacement_char.encode("utf-8"))
-
-                    # there seems to be an edge case at the boundaries: if we have
-                    # a long consecutive list of non-ascii characters to replace,
-                    # pp seems to break it up into segments of length 65 (e.g.,
-                    # num_bytes % 65). this doesn't quite work if each character is
-                    # of size 2, and we'll hit an empty list sooner than later and
-                    # get an error.
-                    #
-                    # we will resolve this by checking the _next_ character in the
-                    # list and checking if its size will be greater than (num_bytes
-                    # - i), where `i` is the current number of bytes we've replaced
-                    # so far. if so, "save" the difference and add it on to the
-                    # next segment.
-                    #
-                    # for example, if we have 124 bytes to replace, pp will break
-                    # it up into 65 (`**_`) and 59 (`**5`). all of the replacement
-                    # characters are 2 bytes, which means when we get to byte 64,
-                    # we have 1 byte left. similarly the 59 bytes in the next
-                    # segment doesn't make sense, because again all replacement
-                    # characters are 2 bytes. so we'll "save" the 1 byte and add it
-                    # on to the next segment (i.e., we're really treating this as
-                    # segments of 64 (`**-`) and 60 (`**6`)
-                    #
-                    # (presumably we could also search for and combine sequences of
-                    # replacement strings, i.e., if we see `**_**5`, we can combine
-                    # the two and add them together to get 65+59=124, and so on.)
-                    #
-                    if len(replacement_list) != 0:
-                        next_replacement_char = replacement_list[0]
-                        next_replacement_char_size = len(
-                            next_replacement_char.encode("utf-8")
-                        )
-
-                        if next_replacement_char_size > (num_bytes - i):
-                            # save the difference and add it to the next segment.
-                            save_bytes = num_bytes - i
-                            # break out of loop
-                            i += save_bytes
-
-                # replace a sub-list with a replacement list
-                # works nicely even if the replacement list is shorter than the sub-list
-                url_list[m.start() + offset : m.end() + offset] = replacement_chars
-
-                # update offset as we're modifying url_list in place
-                # (m.start() and m.end() refer to positions in the original `url` string)
-                offset += len(replacement_chars) - 3
-            else:
-                # shouldn't get here
-                pass
+    def decode_proofpoint_v3(self, unquote_url: bool = False) -> str:
+        # We don't use urlparse here because the mangled URL confuses it (e.g., it's not sure if the query belongs to
+        # the inner or outer URL). The wrapped URL is between the "__"s, followed by the base64 encoded characters that
+        # replace its "*" tokens: /v3/__https://www.example.com__;Iw!![organization_id]![unique_identifier]$
+        match = proofpoint_v3_pattern.search(self.value)
+        if match is None:
+            return ""
 
-        cleaned_url = "".join(url_list)
+        url, replacement_b64 = match.groups()
+
+        try:
+            # The replacement characters use the URL-safe base64 alphabet. See Section 5 in RFC4648.
+            replacement_chars = base64.urlsafe_b64decode(f"{replacement_b64}==").decode("utf-8")
+            cleaned_url = _replace_proofpoint_v3_tokens(url, replacement_chars)
+        except (binascii.Error, IndexError, UnicodeDecodeError):
+            return ""
 
-        # we don't know whether the original URL was quoted or not, so
-        # give the option to unquote the URL.
+        # We don't know whether the original URL was quoted or not, so give the option to unquote the URL.
         if unquote_url:
-            cleaned_url = urllib.parse.unquote(cleaned_url)
+            cleaned_url = unquote(cleaned_url)
 
-        return cleaned_url
+        possible_url = helpers.fix_possible_url(cleaned_url)
+        return possible_url if URL(possible_url).is_url else ""
 
-    def get_base64_urls(self) -> Set[str]:
-        fixed_base64_values = {helpers.fix_possible_value(v) for v in self.get_base64_values()}
-        return {u for u in fixed_base64_values if URL(u).is_url}
+    def _get_is_netloc_ipv4(self) -> bool:
+        if not self.split_value.hostname:
+            return False
 
-    def get_base64_values(self) -> Set[str]:
-        values = set()
+        try:
+            ipaddress.ip_address(self.split_value.hostname)
+            return True
+        except ValueError:
+            return False
 
-        for match in base64_pattern.findall(self.path_original):
-            if helpers.is_base64_ascii(match[0]):
-                values.add(base64.b64decode(f"{match[0]}===").decode("ascii"))
+    def _get_is_netloc_localhost(self) -> bool:
+        if not self.split_value.hostname:
+            return False
 
-        return values
+        hostname = self.split_value.hostname.lower()
+        return hostname == "localhost" or hostname == "localhost.localdomain"
+
+    def _get_is_netloc_valid_tld(self) -> bool:
+        # The TLD lookup only looks at the hostname of the split value, which is what lets it be cached by netloc.
+        import tld
+
+        try:
+            return bool(tld.get_tld(self.split_value, fail_silently=True))
+        except:
+            return False
+
+    def _get_netloc_idna(self) -> str:
+        if all(ord(char) < 128 for char in self.split_value.netloc):
+            return self.split_value.netloc.lower()
+
+        try:
+            idna_hostname = idna.encode(self.split_value.hostname).decode("utf-8").lower()
+            return self.split_value.netloc.replace(self.split_value.hostname, idna_hostname)
+        except idna.core.IDNAError:
+            try:
+                idna_hostname = self.split_value.hostname.encode("idna").decode("utf-8", errors="ignore").lower()
+                return self.split_value.netloc.replace(self.split_value.hostname, idna_hostname)
+            except UnicodeError:
+                return ""
+
+    def _get_netloc_unicode(self) -> str:
+        if any(ord(char) >= 128 for char in self.split_value.netloc):
+            return self.split_value.netloc.lower()
+
+        try:
+            return idna.decode(self.split_value.netloc).lower()
+        except idna.core.IDNAError:
+            return self.split_value.netloc.encode("utf-8", errors="ignore").decode("idna").lower()
 
     def get_child_urls(self) -> "URLList":
         child_urls = []
 
         child_urls += self.get_query_urls()
         child_urls += self.get_fragment_urls()
-        child_urls += self.get_base64_urls()
+        child_urls += self.get_encoded_urls()
 
-        if self.is_mandrillapp:
-            decoded_url = self.decode_mandrillapp()
+        for decoder in redirectors.get_decoders(self.split_value.hostname):
+            decoded_url = decoder(self)
             if decoded_url:
                 child_urls.append(decoded_url)
 
-        if self.is_proofpoint_v2:
-            child_urls.append(self.decode_proofpoint_v2())
+        domain_filter = get_domain_filter()
+        child_urls = [URL(u) for u in dict.fromkeys(child_urls)]
+        return URLList([url for url in child_urls if domain_filter.allows(url.split_value.hostname)])
 
-        if self.is_proofpoint_v3:
-            child_urls.append(self.decode_proofpoint_v3())
+    def get_encoded_urls(self) -> Set[str]:
+        fixed_encoded_values = {helpers.fix_possible_value(v) for v in self.get_encoded_values()}
+        return {u for u in fixed_encoded_values if URL(u).is_url}
 
-        return URLList([URL(u) for u in child_urls])
+    def get_encoded_values(self) -> Set[str]:
+        """Returns the values hidden in the path by (possibly nested) base64, hex, percent, or HTML entity encoding"""
+
+        return decode_payloads(self.path_original)
 
     def get_fragment_urls(self) -> Set[str]:
         return {v for v in self.get_fragment_values() if URL(v).is_url}
@@ -707,3 +578,46 @@ class URL:
             values |= {item for sublist in URL(url).query_dict.values() for item in sublist}
 
         return values
+
+
+def _replace_proofpoint_v3_tokens(url: str, replacement_chars: str) -> str:
+    """Replaces the "*" tokens in a Proofpoint v3 URL, consuming the replacement characters in a single pass"""
+
+    parts = []
+    position = 0
+    last_end = 0
+    save_bytes = 0
+
+    for match in proofpoint_v3_token_pattern.finditer(url):
+        parts.append(url[last_end : match.start()])
+        last_end = match.end()
+
+        token = match.group(0)
+        if token == "*":
+            parts.append(replacement_chars[position])
+            position += 1
+            continue
+
+        # The run length is the number of UTF-8 bytes to copy over, not the number of characters.
+        num_bytes = proofpoint_v3_run_lengths[token[-1]] + save_bytes
+        save_bytes = 0
+
+        replaced_bytes = 0
+        while replaced_bytes < num_bytes:
+            replacement_char = replacement_chars[position]
+            position += 1
+            parts.append(replacement_char)
+            replaced_bytes += len(replacement_char.encode("utf-8"))
+
+            # Proofpoint breaks long runs of replaced characters into segments of at most 65 bytes, which can split a
+            # multi-byte character across two "**X" tokens (e.g., 124 bytes of 2-byte characters become "**_**5", or
+            # 65 + 59 bytes). If the next character does not fit in what is left of this segment, carry the remaining
+            # bytes over to the next segment (treating it as 64 + 60 bytes instead).
+            if position < len(replacement_chars):
+                remaining_bytes = num_bytes - replaced_bytes
+                if len(replacement_chars[position].encode("utf-8")) > remaining_bytes:
+                    save_bytes = remaining_bytes
+                    replaced_bytes = num_bytes
+
+    parts.append(url[last_end:])
+    return "".join(parts)
@@ -1,14 +1,22 @@
 import codecs
-import magic
 import re
 import string
 
-from typing import Set, Union
+from contextlib import ExitStack
+from itertools import chain
+from typing import TYPE_CHECKING, Iterable, Iterator, Set, Union
 
+import urlfinderlib.compression as compression
 import urlfinderlib.finders as finders
 import urlfinderlib.helpers as helpers
 
-from urlfinderlib.url import URL, URLList
+from urlfinderlib.budget import Budget, get_budget, use_budget
+from urlfinderlib.hosts import DomainFilter, use_domain_filter
+from urlfinderlib.instrumentation import Instrumentation, get_instrumentation, use_instrumentation
+from urlfinderlib.url import URL, URLList, URLSet
+
+if TYPE_CHECKING:  # pragma: no cover
+    from urlfinderlib.cache import ResultCache
 
 
 def _remove_utf16_chars(blob: bytes) -> bytes:
@@ -20,46 +28,270 @@ def get_url_permutations(url: str) -> Set[str]:
     return URL(url).permutations
 
 
-def find_urls(blob: Union[bytes, str], base_url: str = "", mimetype: str = "", domain_as_url: bool = False) -> Set[str]:
+def find_urls(
+    blob: Union[bytes, str],
+    base_url: str = "",
+    mimetype: str = "",
+    domain_as_url: bool = False,
+    instrumentation: Instrumentation = None,
+    budget: Budget = None,
+    timeout: float = None,
+    cache: "ResultCache" = None,
+    domain_filter: DomainFilter = None,
+) -> URLSet:
+    """Finds the URLs in the blob. If a budget (or simply a timeout in seconds) is given and runs out, the URLs found
+    up to that point are returned with their partial flag set. If a cache is given, the results for a blob (and
+    options) that were already seen are returned from the cache without parsing the blob again. If a domain filter is
+    given, the URLs of its excluded (or not included) domains are dropped before they are validated."""
+
+    if budget is None and timeout is not None:
+        budget = Budget(timeout=timeout)
+
+    with _use_options(instrumentation, budget, domain_filter):
+        if cache is None:
+            return _find_urls(blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url)
+
+        key = cache.key(
+            blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url, domain_filter=domain_filter
+        )
+        urls = cache.get(key)
+        if urls is None:
+            urls = _find_urls(blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url)
+            cache.set(key, urls)
+
+        return urls
+
+
+def _use_options(instrumentation: Instrumentation, budget: Budget, domain_filter: DomainFilter) -> ExitStack:
+    stack = ExitStack()
+
+    if instrumentation is not None:
+        stack.enter_context(use_instrumentation(instrumentation))
+
+    if budget is not None:
+        stack.enter_context(use_budget(budget))
+
+    if domain_filter is not None:
+        stack.enter_context(use_domain_filter(domain_filter))
+
+    return stack
+
+
+def _find_urls(blob: Union[bytes, str], base_url: str = "", mimetype: str = "", domain_as_url: bool = False) -> URLSet:
+    budget = get_budget()
+    instrumentation = get_instrumentation()
+
+    urls = []
+    for finder_urls in _iter_finder_urls(blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url):
+        urls += finder_urls
+
+    with instrumentation.stage("child_urls"):
+        all_urls = URLList([URL(u) for u in urls]).get_all_urls()
+
+    instrumentation.count("urls", len(all_urls))
+    return URLSet(all_urls, partial=budget.exhausted, reason=budget.exhausted_by)
+
+
+def iter_urls(
+    blob: Union[bytes, str],
+    base_url: str = "",
+    mimetype: str = "",
+    domain_as_url: bool = False,
+    instrumentation: Instrumentation = None,
+    budget: Budget = None,
+    timeout: float = None,
+    domain_filter: DomainFilter = None,
+) -> Iterator[str]:
+    """Yields the same URLs as find_urls, but as soon as each finder has found them and without duplicates. The child
+    URLs of each URL are only expanded once the caller asks for the next URL, so stopping early (e.g., after the first
+    URL) skips the rest of the work. Check the budget (if one was given) to see if the URLs are partial."""
+
+    if budget is None and timeout is not None:
+        budget = Budget(timeout=timeout)
+
+    urls = _iter_urls(blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url)
+    try:
+        while True:
+            # The options are only in use while the generator is running, never in between the URLs it yields, so
+            # they do not leak into the caller's code.
+            with _use_options(instrumentation, budget, domain_filter):
+                url = next(urls, None)
+
+            if url is None:
+                return
+
+            yield url
+    finally:
+        urls.close()
+
+
+def _iter_urls(
+    blob: Union[bytes, str], base_url: str = "", mimetype: str = "", domain_as_url: bool = False
+) -> Iterator[str]:
+    budget = get_budget()
+    instrumentation = get_instrumentation()
+
+    seen = set()
+    expand = True
+
+    for finder_urls in _iter_finder_urls(blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url):
+        for value in finder_urls:
+            stack = [URL(value)]
+            while stack:
+                url = stack.pop()
+                if url.value in seen:
+                    continue
+
+                seen.add(url.value)
+                instrumentation.count("urls")
+                yield url.value
+
+                # Once the budget runs out, the URLs are still yielded but their children are no longer expanded.
+                expand = expand and budget.spend("children")
+                if expand:
+                    instrumentation.count("children", len(url.child_urls))
+                    stack.extend(url.child_urls)
+
+
+def _iter_finder_urls(
+    blob: Union[bytes, str],
+    base_url: str = "",
+    mimetype: str = "",
+    domain_as_url: bool = False,
+    decompress: bool = True,
+) -> Iterator[Iterable[str]]:
+    """Yields the URLs found by each finder that the blob is dispatched to, as each finder finishes"""
+
+    instrumentation = get_instrumentation()
+
     if isinstance(blob, str):
         blob = blob.encode("utf-8", errors="ignore")
 
+    if decompress and compression.get_compression(blob):
+        yield from _iter_decompressed_finder_urls(blob, base_url=base_url, domain_as_url=domain_as_url)
+        return
+
     if not mimetype:
-        mimetype = magic.from_buffer(blob)
+        with instrumentation.stage("magic"):
+            mimetype = _get_mimetype(blob)
     mimetype = mimetype.lower()
 
     if "utf-16" in mimetype:
         blob = _remove_utf16_chars(blob)
-        mimetype = magic.from_buffer(blob)
+        with instrumentation.stage("magic"):
+            mimetype = _get_mimetype(blob)
     mimetype = mimetype.lower()
 
-    urls = []
-
     if "rfc 822" in mimetype or "mail" in mimetype:
-        return set()
+        with instrumentation.stage("finder.EmailUrlFinder"):
+            urls = finders.EmailUrlFinder(blob, base_url=base_url, domain_as_url=domain_as_url).find_urls()
+        yield urls
     elif "html" in mimetype:
-        blob = _unescape_ascii(blob)
-        urls += finders.HtmlUrlFinder(blob, base_url=base_url).find_urls()
+        with instrumentation.stage("unescape_ascii"):
+            blob = _unescape_ascii(blob)
+        with instrumentation.stage("finder.HtmlUrlFinder"):
+            urls = finders.HtmlUrlFinder(blob, base_url=base_url).find_urls()
+        yield urls
     elif "vcalendar" in mimetype:
-        urls += finders.IcalUrlFinder(blob).find_urls()
+        with instrumentation.stage("finder.IcalUrlFinder"):
+            urls = finders.IcalUrlFinder(blob).find_urls()
+        yield urls
     elif "xml" in mimetype:
-        urls += finders.XmlUrlFinder(blob).find_urls()
+        with instrumentation.stage("finder.XmlUrlFinder"):
+            urls = finders.XmlUrlFinder(blob).find_urls()
+        yield urls
     elif b"%PDF-" in blob[:1024]:
-        urls += finders.PdfUrlFinder(blob).find_urls()
+        with instrumentation.stage("finder.PdfUrlFinder"):
+            urls = finders.PdfUrlFinder(blob).find_urls()
+        yield urls
     elif "text" in mimetype:
         if b"xmlns" in blob and b"</" in blob:
-            urls += finders.XmlUrlFinder(blob).find_urls()
+            with instrumentation.stage("finder.XmlUrlFinder"):
+                urls = finders.XmlUrlFinder(blob).find_urls()
+            yield urls
         elif _is_maybe_csv(blob):
-            urls += finders.CsvUrlFinder(blob).find_urls()
+            with instrumentation.stage("finder.CsvUrlFinder"):
+                urls = finders.CsvUrlFinder(blob).find_urls()
+            yield urls
         elif helpers.might_be_html(blob):
-            urls += finders.HtmlUrlFinder(blob).find_urls()
-            urls += finders.TextUrlFinder(blob).find_urls(strict=True, domain_as_url=domain_as_url)
+            with instrumentation.stage("finder.HtmlUrlFinder"):
+                urls = finders.HtmlUrlFinder(blob).find_urls()
+            yield urls
+            with instrumentation.stage("finder.TextUrlFinder"):
+                urls = finders.TextUrlFinder(blob).find_urls(strict=True, domain_as_url=domain_as_url)
+            yield urls
         else:
-            urls += finders.TextUrlFinder(blob).find_urls(strict=True, domain_as_url=domain_as_url)
+            with instrumentation.stage("finder.TextUrlFinder"):
+                urls = finders.TextUrlFinder(blob).find_urls(strict=True, domain_as_url=domain_as_url)
+            yield urls
     else:
-        urls += finders.DataUrlFinder(blob).find_urls()
+        with instrumentation.stage("finder.DataUrlFinder"):
+            urls = finders.DataUrlFinder(blob).find_urls()
+        yield urls
+
+
+def _iter_decompressed_finder_urls(
+    blob: bytes, base_url: str = "", domain_as_url: bool = False
+) -> Iterator[Iterable[str]]:
+    """Dispatches the decompressed contents of a gzip, bzip2, or xz blob. Large plain text (e.g., logs) is dispatched
+    one chunk at a time, so it never has to be fully decompressed in memory. Other documents need all of their contents
+    to be parsed, so they are decompressed in full (up to the size limit). A blob that cannot be decompressed at all is
+    dispatched as is."""
+
+    instrumentation = get_instrumentation()
+
+    with instrumentation.stage("decompress"):
+        chunks = compression.iter_decompressed(blob)
+        first = next(chunks, b"")
+
+    if not first:
+        yield from _iter_finder_urls(blob, base_url=base_url, domain_as_url=domain_as_url, decompress=False)
+        return
+
+    with instrumentation.stage("magic"):
+        mimetype = _get_mimetype(first).lower()
+
+    with instrumentation.stage("decompress"):
+        second = next(chunks, b"")
+
+    if not second or not _is_plain_text(first, mimetype):
+        with instrumentation.stage("decompress"):
+            blob = b"".join(chain([first, second], chunks))
+
+        yield from _iter_finder_urls(
+            blob, base_url=base_url, mimetype=mimetype, domain_as_url=domain_as_url, decompress=False
+        )
+        return
+
+    for chunk in compression.split_lines(chain([first, second], chunks)):
+        yield from _iter_finder_urls(
+            chunk, base_url=base_url, mimetype="text", domain_as_url=domain_as_url, decompress=False
+        )
+
+
+def _is_plain_text(blob: bytes, mimetype: str) -> bool:
+    if "text" not in mimetype or any(t in mimetype for t in ("utf-16", "rfc 822", "mail", "html", "xml", "vcalendar")):
+        return False
+
+    return b"%PDF-" not in blob[:1024] and not helpers.might_be_html(blob)
+
+
+def _get_mimetype(blob: bytes) -> str:
+    # libmagic is only loaded once there is a blob whose mimetype is not known.
+    import magic
+
+    return magic.from_buffer(blob)
+
+
+def warmup() -> None:
+    """Imports every finder and dependency (libmagic, lxml, the TLD list, etc.) ahead of time. Long-lived workers can
+    call this at start up so that the first document they get is not slowed down by the imports."""
+
+    for name in finders.__all__:
+        getattr(finders, name)
 
-    return URLList([URL(u) for u in urls]).get_all_urls()
+    find_urls(b"Visit domain.com or http://domain.com", domain_as_url=True)
+    find_urls(b'<html><body><a href="http://domain.com">domain.com</a></body></html>')
 
 
 def _has_u_escaped_lowercase_bytes(blob: bytes) -> bool: